@@ -0,0 +1,110 @@
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+import argparse
+import json
+import shutil
+import statistics
+import subprocess
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+RESULT_MARKER = "STARTUP_RESULT "
+
+# Each entry point: the module to import and the object it builds on startup.
+# Every run is a fresh interpreter, so nothing is already imported or cached.
+ENTRY_POINTS = {
+    'main.py': ("main", "module.DecisionEngine()"),
+    'check_db.py': ("check_db", "module.RAGRetriever()"),
+    'frontend.app': ("frontend.app", None),
+}
+
+# Heavy modules that startup should not need
+WATCHED_MODULES = ["langchain_google_genai", "langchain", "numpy"]
+
+PROBE = """
+import importlib, json, sys, time
+start = time.perf_counter()
+module = importlib.import_module({module!r})
+imported = time.perf_counter()
+{construct_line}
+constructed = time.perf_counter()
+result = {{
+    'import_ms': (imported - start) * 1000,
+    'construct_ms': (constructed - imported) * 1000,
+    'loaded': [name for name in {watched!r} if name in sys.modules],
+}}
+sys.__stderr__.write({marker!r} + json.dumps(result) + "\\n")
+"""
+
+
+def run_once(name: str, workdir: str) -> dict:
+    """
+    Time one cold start of an entry point in a fresh interpreter
+    """
+    module, construct = ENTRY_POINTS[name]
+    code = PROBE.format(
+        module=module,
+        construct_line=construct or "pass",
+        watched=WATCHED_MODULES,
+        marker=RESULT_MARKER,
+    )
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    completed = subprocess.run(
+        [sys.executable, "-c", code], cwd=workdir, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, timeout=300,
+    )
+    for line in completed.stderr.splitlines():
+        if line.startswith(RESULT_MARKER):
+            return json.loads(line[len(RESULT_MARKER):])
+    raise RuntimeError(f"{name} failed to start:\n{completed.stderr[-2000:]}")
+
+
+def benchmark(names, repeat: int) -> dict:
+    """
+    Median import and construct times per entry point over ``repeat`` cold starts
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        # Work on a copy so the benchmark never touches the real database
+        database = os.path.join(REPO_ROOT, "railway_section.db")
+        if os.path.exists(database):
+            shutil.copy(database, workdir)
+        for name in names:
+            runs = [run_once(name, workdir) for _ in range(repeat)]
+            results[name] = {
+                'import_ms': round(statistics.median(r['import_ms'] for r in runs), 1),
+                'construct_ms': round(statistics.median(r['construct_ms'] for r in runs), 1),
+                'loaded': runs[-1]['loaded'],
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold-start import and construct time")
+    parser.add_argument("entry_points", nargs="*", default=list(ENTRY_POINTS),
+                        help=f"which to measure (default: all of {', '.join(ENTRY_POINTS)})")
+    parser.add_argument("--repeat", type=int, default=3, help="cold starts per entry point (median reported)")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.entry_points if name not in ENTRY_POINTS]
+    if unknown:
+        parser.error(f"unknown entry point(s): {', '.join(unknown)}")
+
+    results = benchmark(args.entry_points, max(1, args.repeat))
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"🚀 Startup benchmark (median of {max(1, args.repeat)} cold starts)")
+    print("=" * 60)
+    for name, result in results.items():
+        loaded = ", ".join(result['loaded']) or "none"
+        print(f"{name:<14} import {result['import_ms']:>8.1f} ms   construct {result['construct_ms']:>7.1f} ms")
+        print(f"{'':<14} heavy modules loaded: {loaded}")
+
+
+if __name__ == "__main__":
+    main()
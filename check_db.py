@@ -2,10 +2,11 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
-from src.database.db_manager import DatabaseManager
+from src.database.db_manager import get_database_manager
+from src.rag.retriever import RAGRetriever
 
 def check_database():
-    db = DatabaseManager()
+    db = get_database_manager()
     
     print('=== TRAINS IN DATABASE ===')
     trains = db.execute_query('SELECT * FROM Train ORDER BY priority, train_no')
@@ -49,5 +50,24 @@ def check_database():
     else:
         print("Station 102: NOT FOUND")
 
+def check_query_plans():
+    retriever = RAGRetriever()
+    
+    print('\n=== QUERY PLANS ===')
+    full_scan_count = 0
+    for entry in retriever.check_query_plans():
+        flag = "FULL SCAN" if entry['full_scans'] else "OK"
+        print(f"{entry['query']}: {flag}")
+        for step in entry['plan']:
+            print(f"  {step}")
+        full_scan_count += len(entry['full_scans'])
+    
+    if full_scan_count:
+        print(f"\n{full_scan_count} full table scan(s) found in retriever queries")
+    else:
+        print("\nNo full table scans in retriever queries")
+    return full_scan_count
+
 if __name__ == "__main__":
     check_database()
+    check_query_plans()
@@ -2,28 +2,37 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify, stream_with_context
 from flask_cors import CORS
 from datetime import datetime
+import json
 
 from src.decision_engine.engine import DecisionEngine
-from src.rag.retriever import RAGRetriever
-from src.database.populate_data import DataPopulator
+from src.decision_engine.jobs import JobManager, JobQueueFull, FINISHED
+from src.rag.context_builder import PROFILES
+from src.startup import Startup
 
 app = Flask(__name__)
 CORS(app)
 
 # Initialize the decision engine
 engine = DecisionEngine()
-retriever = RAGRetriever()
+# Share the engine's retriever so the dashboard and the analyzer use one snapshot cache
+retriever = engine.retriever
+# Background analyses for the job API, so slow LLM calls do not hold web threads
+jobs = JobManager(
+    engine,
+    max_workers=int(os.getenv("JOB_WORKERS", "32")),
+    ttl_seconds=float(os.getenv("JOB_TTL_SECONDS", "600")),
+    max_stored=int(os.getenv("JOB_MAX_STORED", "1000")),
+    max_pending=int(os.getenv("JOB_MAX_PENDING", "1000"))
+)
 
-# Ensure database is populated
-try:
-    populator = DataPopulator()
-    populator.populate_all_data()
-    print("Database initialized and populated successfully!")
-except Exception as e:
-    print(f"Database initialization warning: {e}")
+# Upper bound on LLM calls one batch request may run side by side
+MAX_BATCH_CONCURRENCY = int(os.getenv("MAX_BATCH_CONCURRENCY", "16"))
+
+# Validate the schema, seed sample data only into an empty database, and warm caches in the background
+startup = Startup(engine).run()
 
 @app.route('/')
 def index():
@@ -35,9 +44,7 @@ def get_sections():
     """Get all sections with their current status"""
     try:
         sections = []
-        for section_id in [1, 2, 3]:
-            snapshot = retriever.get_current_section_snapshot(section_id)
-            
+        for section_id, snapshot in retriever.get_section_snapshots().items():
             if 'section' in snapshot:
                 section_data = snapshot['section']
                 
@@ -68,6 +75,15 @@ def get_sections():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/sections/attention')
+def get_sections_needing_attention():
+    """Network-wide rule sweep: sections that need attention, most severe first"""
+    try:
+        limit = request.args.get('limit', type=int)
+        return jsonify(engine.sweep_network(limit))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/section/<int:section_id>')
 def get_section_details(section_id):
     """Get detailed information about a specific section"""
@@ -111,28 +127,193 @@ def analyze_decision():
         data = request.json
         section_id = data.get('section_id')
         issue_description = data.get('issue_description')
+        profile = data.get('profile')
         
         if not section_id or not issue_description:
             return jsonify({'error': 'Missing section_id or issue_description'}), 400
+        if profile is not None and profile not in PROFILES:
+            return jsonify({'error': f"Unknown profile; expected one of {sorted(PROFILES)}"}), 400
         
         # Process the decision
-        decision_package = engine.make_decision(section_id, issue_description)
+        # Optional IncidentType / Severity values; they raise the LLM scheduling priority
+        decision_package = engine.make_decision(section_id, issue_description, 
+                                                issue_type=data.get('issue_type'), 
+                                                profile=profile, 
+                                                severity=data.get('severity'))
+        
+        return jsonify({
+            'success': True,
+            'analysis': serialize_analysis(decision_package)
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/decision/analyze/stream')
+def analyze_decision_stream():
+    """Analyze a decision scenario, streaming the context and then the suggestion as server-sent events"""
+    section_id = request.args.get('section_id', type=int)
+    issue_description = request.args.get('issue_description')
+    profile = request.args.get('profile')
+    issue_type = request.args.get('issue_type')
+    severity = request.args.get('severity')
+    
+    if not section_id or not issue_description:
+        return jsonify({'error': 'Missing section_id or issue_description'}), 400
+    if profile is not None and profile not in PROFILES:
+        return jsonify({'error': f"Unknown profile; expected one of {sorted(PROFILES)}"}), 400
+    
+    def events():
+        try:
+            for event, data in engine.stream_decision(section_id, issue_description, profile, issue_type, severity):
+                yield format_sse(event, data)
+        except Exception as e:
+            yield format_sse('error', {'error': str(e)})
+    
+    return Response(stream_with_context(events()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        # Stop reverse proxies from buffering the stream
+        'X-Accel-Buffering': 'no'
+    })
+
+def format_sse(event, data):
+    """Encode one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+@app.route('/api/decision/analyze_batch', methods=['POST'])
+def analyze_decision_batch():
+    """Analyze many decision scenarios in one request"""
+    try:
+        data = request.json or {}
+        items = data.get('items') or []
+        try:
+            max_concurrency = int(data.get('max_concurrency', 4))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'max_concurrency must be an integer'}), 400
+        max_concurrency = min(max(max_concurrency, 1), MAX_BATCH_CONCURRENCY)
+        
+        if not items:
+            return jsonify({'error': 'Missing items'}), 400
+        if not isinstance(items, list):
+            return jsonify({'error': 'items must be a list'}), 400
+        for item in items:
+            if not isinstance(item, dict):
+                return jsonify({'error': 'Every item must be an object'}), 400
+            if not item.get('section_id') or not item.get('issue_description'):
+                return jsonify({'error': 'Every item needs section_id and issue_description'}), 400
+            if item.get('profile') is not None and item['profile'] not in PROFILES:
+                return jsonify({'error': f"Unknown profile; expected one of {sorted(PROFILES)}"}), 400
+        
+        results = engine.make_decisions(items, max_concurrency=max_concurrency)
+        
+        analyses = []
+        for decision_package in results:
+            analysis = serialize_analysis(decision_package)
+            analysis['timings'] = decision_package['timings']
+            analyses.append(analysis)
         
         return jsonify({
             'success': True,
-            'analysis': {
-                'section_id': decision_package['section_id'],
-                'issue_description': decision_package['issue_description'],
-                'timestamp': decision_package['timestamp'].isoformat(),
-                'current_context': decision_package['current_context'],
-                'historical_decisions': decision_package['historical_decisions'],
-                'ai_suggestion': decision_package['llm_suggestion'],
-                'keywords_used': decision_package['keywords_used']
-            }
+            'results': analyses
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def serialize_analysis(decision_package):
+    """Convert a decision package into the JSON shape the dashboard expects"""
+    return {
+        'section_id': decision_package['section_id'],
+        'issue_description': decision_package['issue_description'],
+        'timestamp': decision_package['timestamp'].isoformat(),
+        'current_context': decision_package['current_context'],
+        'historical_decisions': decision_package['historical_decisions'],
+        'ai_suggestion': decision_package['llm_suggestion'],
+        'llm_status': decision_package.get('llm_status'),
+        'llm_upgrade_id': decision_package.get('llm_upgrade_id'),
+        'keywords_used': decision_package['keywords_used'],
+        'cache': decision_package.get('cache')
+    }
+
+@app.route('/api/decision/jobs', methods=['POST'])
+def submit_decision_job():
+    """Start an analysis in the background; poll or subscribe to the returned job"""
+    try:
+        data = request.json or {}
+        section_id = data.get('section_id')
+        issue_description = data.get('issue_description')
+        profile = data.get('profile')
+        
+        if not section_id or not issue_description:
+            return jsonify({'error': 'Missing section_id or issue_description'}), 400
+        if profile is not None and profile not in PROFILES:
+            return jsonify({'error': f"Unknown profile; expected one of {sorted(PROFILES)}"}), 400
+        
+        job_id = jobs.submit(section_id, issue_description, 
+                             issue_type=data.get('issue_type'), 
+                             profile=profile, 
+                             severity=data.get('severity'))
+        return jsonify({
+            'success': True,
+            'job_id': job_id,
+            'status': 'queued',
+            'status_url': f"/api/decision/jobs/{job_id}",
+            'events_url': f"/api/decision/jobs/{job_id}/events"
+        }), 202
+    except JobQueueFull as e:
+        return jsonify({'error': str(e)}), 503
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/decision/jobs/<job_id>')
+def get_decision_job(job_id):
+    """State of an analysis job; ?wait=N blocks up to N seconds (max 30) for it to finish"""
+    try:
+        wait = min(max(request.args.get('wait', 0, type=float), 0), 30)
+        job = jobs.wait(job_id, wait) if wait else jobs.get(job_id)
+        if job is None:
+            return jsonify({'error': 'Unknown or expired job'}), 404
+        return jsonify(serialize_job(job))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/decision/jobs/<job_id>/events')
+def decision_job_events(job_id):
+    """Server-sent status events as an analysis job progresses, then a final done or failed event"""
+    if jobs.get(job_id) is None:
+        return jsonify({'error': 'Unknown or expired job'}), 404
+    
+    def events():
+        for job in jobs.subscribe(job_id):
+            if job is None:
+                # Keep-alive comment so proxies do not drop an idle stream
+                yield ": keep-alive\n\n"
+            elif job['status'] in FINISHED:
+                yield format_sse(job['status'], serialize_job(job))
+            else:
+                yield format_sse('status', serialize_job(job))
+    
+    return Response(stream_with_context(events()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+def serialize_job(job):
+    """Job state in JSON form, with the analysis once it is done"""
+    serialized = {key: value for key, value in job.items() if key != 'result'}
+    if job['result'] is not None:
+        serialized['analysis'] = serialize_analysis(job['result'])
+    return serialized
+
+@app.route('/api/decision/upgrade/<upgrade_id>')
+def get_decision_upgrade(upgrade_id):
+    """Collect the LLM answer for an analysis that fell back to rules on timeout"""
+    try:
+        upgrade = engine.get_suggestion_upgrade(upgrade_id)
+        if 'llm_suggestion' in upgrade:
+            upgrade['ai_suggestion'] = upgrade.pop('llm_suggestion')
+        return jsonify(upgrade), 404 if upgrade['status'] == 'unknown' else 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/decision/store', methods=['POST'])
 def store_decision():
     """Store a controller's final decision"""
@@ -200,10 +381,30 @@ def get_predefined_scenarios():
     ]
     return jsonify(scenarios)
 
+@app.route('/api/health')
+def health():
+    """Readiness: 200 once the schema is valid and the caches are warm, 503 until then"""
+    report = startup.health()
+    return jsonify(report), 200 if report['ready'] else 503
+
+@app.route('/api/metrics')
+def get_metrics():
+    """Cache and LLM call counters"""
+    try:
+        return jsonify({
+            'snapshot_cache': retriever.snapshot_cache.stats(),
+            'decision_cache': engine.result_cache.stats() if engine.result_cache else None,
+            'llm': engine.llm_stats(),
+            'llm_guard': engine.llm_guard_stats(),
+            'jobs': jobs.stats()
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 if __name__ == '__main__':
     print("🚂 Railway Section Controller Web Interface")
     print("=" * 50)
     print("Starting server at http://localhost:5000")
-    print("Database populated with sample data")
+    print("Database checked; sample data is only loaded into an empty database")
     print("AI Decision Engine ready!")
     app.run(debug=True, host='0.0.0.0', port=5000)
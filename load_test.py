@@ -0,0 +1,167 @@
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+import argparse
+import contextlib
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# (section_id, issue) pairs cycled through by the load generator
+SCENARIOS = [
+    (1, "Signal failure at main line, two superfast trains approaching"),
+    (2, "Heavy fog conditions, multiple delayed trains, crew fatigue reported"),
+    (3, "Power block due to tripped overhead line, freight train blocking main line"),
+    (1, "Festival rush with 40% extra passenger load, platform congestion at major station"),
+]
+
+
+def configure_fake_backend(args):
+    """Select the fake LLM backend through the same environment variables a deployment would use"""
+    os.environ.update({
+        'LLM_BACKEND': 'fake',
+        'FAKE_LLM_LATENCY_MS': str(args.latency_ms),
+        'FAKE_LLM_JITTER_MS': str(args.jitter_ms),
+        'FAKE_LLM_LATENCY_DISTRIBUTION': args.distribution,
+        'FAKE_LLM_TOKENS_PER_SECOND': str(args.tokens_per_second),
+        'FAKE_LLM_RESPONSE_TOKENS': str(args.response_tokens),
+        'FAKE_LLM_FAILURE_RATE': str(args.failure_rate),
+        'LLM_TIMEOUT_SECONDS': str(args.llm_timeout),
+    })
+    if args.seed is not None:
+        os.environ['FAKE_LLM_SEED'] = str(args.seed)
+    # LLM scheduler limits; unset flags keep the environment's (or the default) values
+    if args.requests_per_minute is not None:
+        os.environ['LLM_REQUESTS_PER_MINUTE'] = str(args.requests_per_minute)
+    if args.llm_concurrency is not None:
+        os.environ['LLM_MAX_CONCURRENCY'] = str(args.llm_concurrency)
+
+
+def engine_target(args):
+    """Call DecisionEngine.make_decision directly"""
+    from src.decision_engine.engine import DecisionEngine
+
+    engine = DecisionEngine(result_cache_ttl=300.0 if args.cache else None)
+
+    def call(section_id, issue):
+        return engine.make_decision(section_id, issue)['llm_status']
+    return engine, call
+
+
+def flask_target(args):
+    """POST to /api/decision/analyze through the Flask test client"""
+    import frontend.app as web
+
+    if not args.cache:
+        web.engine.result_cache = None
+    local = threading.local()
+
+    def call(section_id, issue):
+        if not hasattr(local, 'client'):
+            local.client = web.app.test_client()
+        response = local.client.post('/api/decision/analyze', json={
+            'section_id': section_id,
+            'issue_description': issue
+        })
+        if response.status_code != 200:
+            raise RuntimeError(f"HTTP {response.status_code}: {response.get_json()}")
+        return response.get_json()['analysis']['llm_status']
+    return web.engine, call
+
+
+def run_load(call, requests: int, concurrency: int):
+    """
+    Issue ``requests`` calls from ``concurrency`` workers; returns
+    (latencies in ms, llm status counts, errors, wall time in seconds)
+    """
+    latencies, statuses, errors = [], {}, []
+    lock = threading.Lock()
+
+    def one(index):
+        section_id, issue = SCENARIOS[index % len(SCENARIOS)]
+        start = time.perf_counter()
+        try:
+            status = call(section_id, issue)
+        except Exception as e:
+            with lock:
+                errors.append(str(e))
+            return
+        elapsed = (time.perf_counter() - start) * 1000
+        with lock:
+            latencies.append(elapsed)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(one, range(requests)))
+    return latencies, statuses, errors, time.perf_counter() - started
+
+
+def percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the analyze path offline against the fake LLM backend")
+    parser.add_argument("--target", choices=["engine", "flask"], default="engine")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--cache", action="store_true", help="keep the decision result cache on")
+    parser.add_argument("--latency-ms", type=float, default=800.0, help="fake LLM time to first token")
+    parser.add_argument("--jitter-ms", type=float, default=200.0)
+    parser.add_argument("--distribution", choices=["fixed", "uniform", "normal", "lognormal"], default="normal")
+    parser.add_argument("--tokens-per-second", type=float, default=60.0)
+    parser.add_argument("--response-tokens", type=int, default=120)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--llm-timeout", type=float, default=10.0, help="engine latency budget for the LLM step")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--requests-per-minute", type=float, help="LLM scheduler rate limit (0 for none)")
+    parser.add_argument("--llm-concurrency", type=int, help="LLM scheduler concurrency cap")
+    parser.add_argument("--verbose", action="store_true", help="show the engine's own log output")
+    args = parser.parse_args()
+
+    configure_fake_backend(args)
+    with tempfile.TemporaryDirectory() as workdir:
+        # Work on a copy so the load test never touches the real database
+        database = os.path.join(REPO_ROOT, "railway_section.db")
+        if os.path.exists(database):
+            shutil.copy(database, workdir)
+        os.chdir(workdir)
+        sys.path.insert(0, REPO_ROOT)
+
+        with contextlib.ExitStack() as quiet:
+            if not args.verbose:
+                quiet.enter_context(contextlib.redirect_stdout(quiet.enter_context(open(os.devnull, "w"))))
+            engine, call = (flask_target if args.target == "flask" else engine_target)(args)
+            latencies, statuses, errors, wall = run_load(call, args.requests, args.concurrency)
+            llm_stats = engine.llm_stats()
+            guard_stats = engine.llm_guard_stats()
+
+    print(f"🚂 Load test: {args.requests} requests to {args.target}, concurrency {args.concurrency}")
+    print(f"   Fake LLM: {args.distribution} {args.latency_ms:.0f}±{args.jitter_ms:.0f} ms to first token, "
+          f"{args.response_tokens} tokens at {args.tokens_per_second:.0f}/s, failure rate {args.failure_rate:.0%}")
+    print("=" * 60)
+    if latencies:
+        print(f"✅ Completed: {len(latencies)}   ❌ Errors: {len(errors)}")
+        print(f"⏱️  Latency ms: p50 {percentile(latencies, 0.5):.0f}   p90 {percentile(latencies, 0.9):.0f}   "
+              f"p99 {percentile(latencies, 0.99):.0f}   max {max(latencies):.0f}   "
+              f"mean {statistics.mean(latencies):.0f}")
+        print(f"📈 Throughput: {len(latencies) / wall:.1f} req/s over {wall:.1f}s")
+    else:
+        print(f"❌ All {len(errors)} requests failed")
+    print(f"🤖 LLM status: {statuses}")
+    print(f"🔗 LLM calls: {llm_stats}")
+    print(f"🛡️  LLM guard: {guard_stats}")
+    for error in errors[:5]:
+        print(f"   Error: {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,13 +4,12 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
 from src.database.populate_data import DataPopulator
 from src.decision_engine.engine import DecisionEngine
-from src.rag.retriever import RAGRetriever
 import time
 
 class DecisionEngineDemo:
     def __init__(self):
         self.engine = DecisionEngine()
-        self.retriever = RAGRetriever()
+        self.retriever = self.engine.retriever
         self.setup_data()
     
     def setup_data(self):
@@ -54,9 +53,7 @@ class DecisionEngineDemo:
         print("\n📊 CURRENT SECTION STATUS")
         print("-" * 40)
         
-        for section_id in [1, 2, 3]:
-            snapshot = self.retriever.get_current_section_snapshot(section_id)
-            
+        for section_id, snapshot in self.retriever.get_section_snapshots().items():
             if 'section' in snapshot:
                 section = snapshot['section']
                 print(f"\nSection {section_id}: {section['name']}")
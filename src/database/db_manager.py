@@ -1,20 +1,316 @@
 import sqlite3
 import os
+import queue
+import re
+import threading
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterable, Sequence
+
+# Pragmas applied once to every pooled connection when it is opened
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',        # readers no longer block the writer (and vice versa)
+    'synchronous': 'NORMAL',      # safe with WAL, avoids an fsync per commit
+    'cache_size': -16000,         # ~16 MB page cache per connection
+    'mmap_size': 268435456,       # map up to 256 MB of the file
+    'temp_store': 'MEMORY',
+}
+
+# Table written by an INSERT/REPLACE/UPDATE/DELETE statement
+_WRITE_TARGET = re.compile(
+    r"^\s*(?:INSERT(?:\s+OR\s+\w+)?\s+INTO|REPLACE\s+INTO|UPDATE(?:\s+OR\s+\w+)?|DELETE\s+FROM)\s+(\w+)",
+    re.IGNORECASE
+)
+
+# Bumped whenever a migration is appended to DatabaseManager._migrations()
+SCHEMA_VERSION = 9
+
+# Secondary indexes matched to the retriever's filter/sort shapes (name -> DDL)
+INDEXES = {
+    'idx_station_section':
+        "CREATE INDEX IF NOT EXISTS idx_station_section ON Station(section_id)",
+    'idx_external_factors_section':
+        "CREATE INDEX IF NOT EXISTS idx_external_factors_section ON ExternalFactors(section_id)",
+    'idx_incidents_section_time':
+        "CREATE INDEX IF NOT EXISTS idx_incidents_section_time ON Incidents(section_id, timestamp)",
+    # Covers the per-section outcome counts as well as the recency ordering
+    'idx_decisions_section_time':
+        "CREATE INDEX IF NOT EXISTS idx_decisions_section_time ON Decisions(section_id, timestamp, outcome)",
+    'idx_decisions_time':
+        "CREATE INDEX IF NOT EXISTS idx_decisions_time ON Decisions(timestamp)",
+}
+
+
+def _merge_stats(section_expr: str, date_expr: str, counters: Dict[str, str],
+                 source: str = "", condition: str = "true") -> str:
+    """UPSERT adding ``counters`` (column -> expression) to a SectionDailyStats day bucket, per row of ``source`` if given"""
+    columns = ", ".join(counters)
+    values = ", ".join(counters.values())
+    updates = ", ".join(f"{column} = {column} + excluded.{column}" for column in counters)
+    if source:
+        # An explicit WHERE keeps SQLite from parsing ON CONFLICT as a join constraint
+        select = f"SELECT {section_expr}, {date_expr}, {values} {source} WHERE {condition}"
+    else:
+        select = f"VALUES ({section_expr}, {date_expr}, {values})"
+    return (f"INSERT INTO SectionDailyStats (section_id, bucket_date, {columns}) {select} "
+            f"ON CONFLICT(section_id, bucket_date) DO UPDATE SET {updates}")
+
+
+def _train_report(row: str) -> Dict[str, str]:
+    return {
+        'train_reports': "1",
+        'delay_minutes_total': f"{row}.delay_minutes",
+        'on_time_reports': f"{row}.current_status = 'On Time'",
+    }
+
+
+def _outcome_counts(row: str, sign: int) -> Dict[str, str]:
+    return {
+        'resolved': f"{sign} * ({row}.outcome = 'Resolved')",
+        'partially_resolved': f"{sign} * ({row}.outcome = 'Partially Resolved')",
+        'escalated': f"{sign} * ({row}.outcome = 'Escalated')",
+    }
+
+
+class ConnectionPool:
+    """Bounded pool of persistent SQLite connections shared between threads.
+
+    A connection is only ever used by one thread at a time (the borrower), so
+    the connections are opened with ``check_same_thread=False`` and handed out
+    from a LIFO queue to keep the most recently used (warmest) one in play.
+    """
+
+    def __init__(self, db_path: str, max_size: int = 8,
+                 pragmas: Optional[Dict[str, Any]] = None, timeout: float = 30.0):
+        self.db_path = db_path
+        # Every ":memory:" connection is a separate database, so share just one
+        self.max_size = 1 if db_path == ":memory:" else max(1, max_size)
+        self.pragmas = DEFAULT_PRAGMAS if pragmas is None else pragmas
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+
+    def _create_connection(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout,
+                               check_same_thread=False, cached_statements=256)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        """Borrow a connection, opening a new one while below ``max_size``"""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if len(self._connections) < self.max_size:
+                conn = self._create_connection()
+                self._connections.append(conn)
+                return conn
+
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise sqlite3.OperationalError(
+                f"Timed out after {self.timeout}s waiting for a pooled connection to {self.db_path}"
+            )
+
+    def release(self, conn: sqlite3.Connection):
+        """Return a borrowed connection, rolling back anything left uncommitted"""
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+    def close_all(self):
+        """Close every connection opened by the pool"""
+        with self._lock:
+            while True:
+                try:
+                    self._idle.get_nowait()
+                except queue.Empty:
+                    break
+            for conn in self._connections:
+                conn.close()
+            self._connections = []
+
+    @property
+    def size(self) -> int:
+        return len(self._connections)
+
 
 class DatabaseManager:
-    def __init__(self, db_path: str = "railway_section.db"):
+    # Databases whose schema has already been brought up to date in this process
+    _bootstrapped = set()
+    _bootstrap_lock = threading.Lock()
+
+    def __init__(self, db_path: str = "railway_section.db", pooled: bool = True, pool_size: int = 8):
         self.db_path = db_path
+        self.pool = ConnectionPool(db_path, max_size=pool_size) if pooled else None
+        # Connection of the transaction the current thread is inside, if any
+        self._local = threading.local()
+        # Per-table write counters, bumped after every committed write made through this manager
+        self._table_versions: Dict[str, int] = {}
+        self._versions_lock = threading.Lock()
         self.init_database()
+
+    @property
+    def _bootstrap_key(self) -> str:
+        # Each in-memory database belongs to a single manager
+        if self.db_path == ":memory:":
+            return f":memory:{id(self)}"
+        return _path_key(self.db_path)
     
     def get_connection(self):
-        """Get database connection"""
+        """Get a new, unpooled database connection (caller closes it)"""
         return sqlite3.connect(self.db_path)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection for the duration of a ``with`` block"""
+        transaction_conn = getattr(self._local, 'transaction_conn', None)
+        if transaction_conn is not None:
+            # Statements issued inside transaction() share its connection
+            yield transaction_conn
+        elif self.pool is None:
+            conn = self.get_connection()
+            try:
+                yield conn
+            finally:
+                conn.close()
+        else:
+            conn = self.pool.acquire()
+            try:
+                yield conn
+            finally:
+                self.pool.release(conn)
+
+    @contextmanager
+    def transaction(self):
+        """Run every statement this thread issues inside the block as one transaction.
+
+        execute_insert/execute_update/execute_many calls made inside the block
+        do not commit individually; the whole block commits on exit or rolls
+        back on error. Nested transaction() blocks join the outer one.
+        """
+        if getattr(self._local, 'transaction_conn', None) is not None:
+            yield self._local.transaction_conn
+            return
+
+        with self.connection() as conn:
+            conn.execute("BEGIN")
+            self._local.transaction_conn = conn
+            self._local.written_tables = set()
+            try:
+                yield conn
+                conn.commit()
+                self._bump_table_versions(self._local.written_tables)
+            except BaseException:
+                conn.rollback()
+                raise
+            finally:
+                self._local.transaction_conn = None
+                self._local.written_tables = set()
+
+    @contextmanager
+    def read_transaction(self):
+        """Yield a ``query(sql, params)`` function whose queries all read one point-in-time view.
+
+        Every query runs on the same connection inside a single read
+        transaction, so a write committed meanwhile is either visible to all
+        of them or to none. Repeated SQL reuses the connection's prepared
+        statement cache.
+        """
+        with self.connection() as conn:
+            # Inside transaction() the enclosing transaction already pins the view
+            owns_transaction = not conn.in_transaction
+            if owns_transaction:
+                conn.execute("BEGIN")
+            cursor = conn.cursor()
+            cursor.row_factory = sqlite3.Row
+
+            def query(sql: str, params: tuple = ()) -> List[Dict[str, Any]]:
+                cursor.execute(sql, params)
+                return [dict(row) for row in cursor.fetchall()]
+
+            try:
+                yield query
+            finally:
+                if owns_transaction:
+                    conn.commit()
+
+    def _commit(self, conn: sqlite3.Connection, query: str):
+        """Commit unless the statement belongs to an enclosing transaction(), then record the write"""
+        match = _WRITE_TARGET.match(query)
+        tables = {match.group(1)} if match else set()
+        if getattr(self._local, 'transaction_conn', None) is None:
+            conn.commit()
+            self._bump_table_versions(tables)
+        else:
+            # Versions move only once the enclosing transaction commits
+            self._local.written_tables |= tables
+
+    def _bump_table_versions(self, tables):
+        if not tables:
+            return
+        with self._versions_lock:
+            for table in tables:
+                key = table.lower()
+                self._table_versions[key] = self._table_versions.get(key, 0) + 1
+
+    def table_versions(self, tables: Sequence[str]) -> tuple:
+        """Current write counters for ``tables``; any committed write through this manager changes them"""
+        with self._versions_lock:
+            return tuple(self._table_versions.get(table.lower(), 0) for table in tables)
+
+    def close(self):
+        """Close all pooled connections"""
+        if self.pool is not None:
+            self.pool.close_all()
     
     def init_database(self):
-        """Initialize database with all required tables"""
-        conn = self.get_connection()
+        """Bring the schema up to SCHEMA_VERSION, at most once per database per process"""
+        key = self._bootstrap_key
+        if key in DatabaseManager._bootstrapped:
+            return
+
+        with DatabaseManager._bootstrap_lock:
+            if key in DatabaseManager._bootstrapped:
+                return
+
+            with self.connection() as conn:
+                current_version = conn.execute("PRAGMA user_version").fetchone()[0]
+                if current_version < SCHEMA_VERSION:
+                    # Take the write lock first so concurrent workers migrate one at a time
+                    conn.execute("BEGIN IMMEDIATE")
+                    current_version = conn.execute("PRAGMA user_version").fetchone()[0]
+                    for version, migrate in self._migrations():
+                        if version > current_version:
+                            migrate(conn)
+                            conn.execute(f"PRAGMA user_version = {version}")
+                    conn.commit()
+                    print(f"Database initialized successfully! (schema v{current_version} -> v{SCHEMA_VERSION})")
+
+            DatabaseManager._bootstrapped.add(key)
+
+    def _migrations(self):
+        """Ordered (version, migration) pairs; never edit a released entry, append a new one"""
+        return [
+            (1, self._create_tables),
+            (2, self._create_indexes),
+            (3, self._create_decision_search_index),
+            (4, self._add_train_placement),
+            (5, self._create_section_stats),
+            (6, self._create_keyword_vocabulary),
+            (7, self._create_decision_cache),
+            (8, self._add_section_stats_update_triggers),
+            (9, self._drop_unused_train_index),
+        ]
+
+    def _create_tables(self, conn: sqlite3.Connection):
+        """Create the core schema tables"""
         cursor = conn.cursor()
         
         # Create Train table
@@ -98,37 +394,268 @@ class DatabaseManager:
                 FOREIGN KEY (section_id) REFERENCES Section(section_id)
             )
         ''')
+    
+    def _create_indexes(self, conn: sqlite3.Connection):
+        """Create the managed secondary indexes"""
+        for ddl in INDEXES.values():
+            conn.execute(ddl)
+    
+    def _create_decision_search_index(self, conn: sqlite3.Connection):
+        """Create the FTS5 index over Decisions.controller_action, kept in sync by triggers"""
+        try:
+            conn.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS DecisionsFTS USING fts5(
+                    controller_action,
+                    content='Decisions',
+                    content_rowid='decision_id',
+                    tokenize='porter unicode61'
+                )
+            ''')
+        except sqlite3.OperationalError as e:
+            # SQLite built without FTS5; the retriever falls back to LIKE search
+            print(f"Warning: full-text decision search unavailable - {e}")
+            return
         
-        conn.commit()
-        conn.close()
-        print("Database initialized successfully!")
+        conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS decisions_fts_insert AFTER INSERT ON Decisions BEGIN
+                INSERT INTO DecisionsFTS(rowid, controller_action)
+                VALUES (new.decision_id, new.controller_action);
+            END
+        ''')
+        conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS decisions_fts_delete AFTER DELETE ON Decisions BEGIN
+                INSERT INTO DecisionsFTS(DecisionsFTS, rowid, controller_action)
+                VALUES ('delete', old.decision_id, old.controller_action);
+            END
+        ''')
+        conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS decisions_fts_update AFTER UPDATE OF controller_action ON Decisions BEGIN
+                INSERT INTO DecisionsFTS(DecisionsFTS, rowid, controller_action)
+                VALUES ('delete', old.decision_id, old.controller_action);
+                INSERT INTO DecisionsFTS(rowid, controller_action)
+                VALUES (new.decision_id, new.controller_action);
+            END
+        ''')
+        
+        # Index the decisions that already exist
+        conn.execute("INSERT INTO DecisionsFTS(DecisionsFTS) VALUES ('rebuild')")
+    
+    def _add_train_placement(self, conn: sqlite3.Connection):
+        """Record where each train currently is: section, block and (if at one) station"""
+        conn.execute("ALTER TABLE Train ADD COLUMN current_section_id INTEGER REFERENCES Section(section_id)")
+        conn.execute("ALTER TABLE Train ADD COLUMN current_block VARCHAR(50)")
+        conn.execute("ALTER TABLE Train ADD COLUMN current_station_id INTEGER REFERENCES Station(station_id)")
+        # Serves the per-section train list in its display order
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_train_section "
+            "ON Train(current_section_id, priority, delay_minutes DESC)"
+        )
+        
+        # Place the trains that already exist, or per-section queries would find none: the
+        # sample trains where the sample data puts them, any others spread over the sections
+        from src.database.populate_data import SAMPLE_TRAIN_PLACEMENTS
+        
+        sections = [row[0] for row in conn.execute("SELECT section_id FROM Section ORDER BY section_id")]
+        stations = {row[0] for row in conn.execute("SELECT station_id FROM Station")}
+        if not sections:
+            return
+        section_set = set(sections)
+        placements = []
+        trains = conn.execute("SELECT train_id FROM Train ORDER BY train_id").fetchall()
+        for position, (train_id,) in enumerate(trains):
+            section_id, block, station_id = SAMPLE_TRAIN_PLACEMENTS.get(train_id, (None, None, None))
+            if section_id not in section_set:
+                section_id, block, station_id = sections[position % len(sections)], None, None
+            placements.append((section_id, block, station_id if station_id in stations else None, train_id))
+        conn.executemany(
+            "UPDATE Train SET current_section_id = ?, current_block = ?, current_station_id = ? WHERE train_id = ?",
+            placements
+        )
+    
+    def _create_section_stats(self, conn: sqlite3.Connection):
+        """Create the per-section daily summary table and the triggers that maintain it.
+
+        Every train status report, decision and incident adds to the counters
+        of its section's day bucket, so windowed metrics read at most one row
+        per day instead of re-aggregating the raw history.
+        """
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS SectionDailyStats (
+                section_id INTEGER NOT NULL,
+                bucket_date DATE NOT NULL,
+                train_reports INTEGER NOT NULL DEFAULT 0,
+                delay_minutes_total INTEGER NOT NULL DEFAULT 0,
+                on_time_reports INTEGER NOT NULL DEFAULT 0,
+                incidents INTEGER NOT NULL DEFAULT 0,
+                resolved INTEGER NOT NULL DEFAULT 0,
+                partially_resolved INTEGER NOT NULL DEFAULT 0,
+                escalated INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (section_id, bucket_date),
+                FOREIGN KEY (section_id) REFERENCES Section(section_id)
+            ) WITHOUT ROWID
+        ''')
+        
+        today = "date('now', 'localtime')"
+        triggers = {
+            # Each insert or status/delay/position change of a placed train is one report
+            'section_stats_train_insert': (
+                "AFTER INSERT ON Train WHEN new.current_section_id IS NOT NULL",
+                _merge_stats("new.current_section_id", today, _train_report("new"))),
+            'section_stats_train_update': (
+                "AFTER UPDATE OF current_status, delay_minutes, current_section_id ON Train "
+                "WHEN new.current_section_id IS NOT NULL",
+                _merge_stats("new.current_section_id", today, _train_report("new"))),
+            'section_stats_decision_insert': (
+                "AFTER INSERT ON Decisions",
+                _merge_stats("new.section_id", "date(new.timestamp)", _outcome_counts("new", 1))),
+            'section_stats_decision_delete': (
+                "AFTER DELETE ON Decisions",
+                _merge_stats("old.section_id", "date(old.timestamp)", _outcome_counts("old", -1))),
+            'section_stats_incident_insert': (
+                "AFTER INSERT ON Incidents",
+                _merge_stats("new.section_id", "date(new.timestamp)", {'incidents': "1"})),
+            'section_stats_incident_delete': (
+                "AFTER DELETE ON Incidents",
+                _merge_stats("old.section_id", "date(old.timestamp)", {'incidents': "-1"})),
+        }
+        for name, (event, statement) in triggers.items():
+            conn.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {event} BEGIN {statement}; END")
+        
+        # Backfill from the rows that already exist
+        conn.execute(_merge_stats("d.section_id", "date(d.timestamp)",
+                                  _outcome_counts("d", 1), "FROM Decisions d"))
+        conn.execute(_merge_stats("i.section_id", "date(i.timestamp)",
+                                  {'incidents': "1"}, "FROM Incidents i"))
+        conn.execute(_merge_stats("t.current_section_id", today, _train_report("t"),
+                                  "FROM Train t", "t.current_section_id IS NOT NULL"))
+    
+    def _add_section_stats_update_triggers(self, conn: sqlite3.Connection):
+        """Keep SectionDailyStats right when a decision or incident is edited.
+
+        An update moves the row's counts out of its old day bucket and into
+        the new one. Counts left wrong by edits made before these triggers
+        existed are rebuilt from the current rows.
+        """
+        triggers = {
+            'section_stats_decision_update': (
+                "AFTER UPDATE OF section_id, timestamp, outcome ON Decisions",
+                [_merge_stats("old.section_id", "date(old.timestamp)", _outcome_counts("old", -1)),
+                 _merge_stats("new.section_id", "date(new.timestamp)", _outcome_counts("new", 1))]),
+            'section_stats_incident_update': (
+                "AFTER UPDATE OF section_id, timestamp ON Incidents",
+                [_merge_stats("old.section_id", "date(old.timestamp)", {'incidents': "-1"}),
+                 _merge_stats("new.section_id", "date(new.timestamp)", {'incidents': "1"})]),
+        }
+        for name, (event, statements) in triggers.items():
+            body = "".join(f"{statement}; " for statement in statements)
+            conn.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {event} BEGIN {body}END")
+        
+        conn.execute("UPDATE SectionDailyStats SET incidents = 0, resolved = 0, partially_resolved = 0, escalated = 0")
+        conn.execute(_merge_stats("d.section_id", "date(d.timestamp)",
+                                  _outcome_counts("d", 1), "FROM Decisions d"))
+        conn.execute(_merge_stats("i.section_id", "date(i.timestamp)",
+                                  {'incidents': "1"}, "FROM Incidents i"))
+    
+    def _drop_unused_train_index(self, conn: sqlite3.Connection):
+        """Drop idx_train_priority_delay (created by migration 2 before it left INDEXES).
+
+        Since trains are listed per section, idx_train_section serves every
+        train query, so this index only slowed down train writes.
+        """
+        conn.execute("DROP INDEX IF EXISTS idx_train_priority_delay")
+    
+    def _create_keyword_vocabulary(self, conn: sqlite3.Connection):
+        """Create the configurable keyword vocabulary (empty means use the built-in defaults)"""
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS KeywordVocabulary (
+                term VARCHAR(100) PRIMARY KEY,
+                category VARCHAR(50) NOT NULL,
+                weight REAL NOT NULL DEFAULT 1.0
+            )
+        ''')
+    
+    def _create_decision_cache(self, conn: sqlite3.Connection):
+        """Create the persisted decision result cache"""
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS DecisionCache (
+                cache_key TEXT PRIMARY KEY,
+                section_id INTEGER NOT NULL,
+                package TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        # Serves LRU eviction, which trims the oldest last_access entries
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_decision_cache_access ON DecisionCache(last_access)")
+    
+    def table_exists(self, name: str) -> bool:
+        """Check whether a table (including virtual tables) exists"""
+        rows = self.execute_query("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,))
+        return bool(rows)
     
     def execute_query(self, query: str, params: tuple = ()) -> List[Dict[str, Any]]:
         """Execute a SELECT query and return results as list of dictionaries"""
-        conn = self.get_connection()
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute(query, params)
-        results = [dict(row) for row in cursor.fetchall()]
-        conn.close()
-        return results
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = sqlite3.Row
+            cursor.execute(query, params)
+            return [dict(row) for row in cursor.fetchall()]
     
+    def explain_query_plan(self, query: str, params: tuple = ()) -> List[str]:
+        """Return the detail lines of EXPLAIN QUERY PLAN for a query"""
+        rows = self.execute_query(f"EXPLAIN QUERY PLAN {query}", params)
+        return [row['detail'] for row in rows]
+
     def execute_insert(self, query: str, params: tuple = ()) -> int:
         """Execute an INSERT query and return the last row ID"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute(query, params)
-        last_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        return last_id
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            last_id = cursor.lastrowid
+            self._commit(conn, query)
+            return last_id
     
     def execute_update(self, query: str, params: tuple = ()) -> int:
         """Execute an UPDATE/DELETE query and return the number of affected rows"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute(query, params)
-        affected_rows = cursor.rowcount
-        conn.commit()
-        conn.close()
-        return affected_rows
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            affected_rows = cursor.rowcount
+            self._commit(conn, query)
+            return affected_rows
+
+    def execute_many(self, query: str, rows: Iterable[Sequence[Any]]) -> int:
+        """Execute a statement once per parameter row in a single transaction; returns affected rows"""
+        with self.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.executemany(query, rows)
+            self._commit(conn, query)
+            return cursor.rowcount
+
+    def bulk_insert(self, table: str, columns: Sequence[str], rows: Iterable[Sequence[Any]]) -> int:
+        """Insert many rows into ``table`` with one prepared statement and one commit"""
+        placeholders = ", ".join("?" for _ in columns)
+        query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+        return self.execute_many(query, rows)
+
+
+def _path_key(db_path: str) -> str:
+    return db_path if db_path == ":memory:" else os.path.abspath(db_path)
+
+
+_shared_managers: Dict[str, DatabaseManager] = {}
+_shared_lock = threading.Lock()
+
+
+def get_database_manager(db_path: str = "railway_section.db") -> DatabaseManager:
+    """Return the process-wide DatabaseManager for ``db_path``, creating it on first use"""
+    key = _path_key(db_path)
+    manager = _shared_managers.get(key)
+    if manager is None:
+        with _shared_lock:
+            manager = _shared_managers.get(key)
+            if manager is None:
+                manager = DatabaseManager(db_path)
+                _shared_managers[key] = manager
+    return manager
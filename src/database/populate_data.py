@@ -2,36 +2,62 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.database.db_manager import DatabaseManager
+from src.database.db_manager import get_database_manager
 from datetime import datetime, timedelta
 import random
 
+# Where each sample train is: train_id -> (section_id, block, station_id or None)
+SAMPLE_TRAIN_PLACEMENTS = {
+    1001: (1, "A-BLK-2", None),
+    1002: (1, "A-BLK-4", None),
+    1003: (2, "B-BLK-1", None),
+    2001: (1, "A-BLK-3", None),
+    2002: (3, "C-BLK-2", None),
+    2003: (2, "B-BLK-3", 201),
+    2004: (3, "C-BLK-1", None),
+    3001: (1, "A-BLK-1", 102),
+    3002: (2, "B-BLK-2", None),
+    3003: (3, "C-BLK-3", 301),
+    3004: (3, "C-BLK-4", None),
+    4001: (1, "A-BLK-5", 101),
+    4002: (2, "B-BLK-4", 202),
+    4003: (2, "B-BLK-4", 202),
+    4004: (3, "C-BLK-5", None),
+}
+
 class DataPopulator:
-    def __init__(self):
-        self.db = DatabaseManager()
+    def __init__(self, db=None):
+        self.db = db or get_database_manager()
     
     def populate_all_data(self):
         """Populate all tables with sample data"""
         print("Populating database with sample data...")
         
-        # Clear existing data
-        self.clear_all_data()
-        
-        # Populate in dependency order
-        self.populate_sections()
-        self.populate_stations()
-        self.populate_trains()
-        self.populate_external_factors()
-        self.populate_incidents()
-        self.populate_decisions()
+        # Clear and reload as a single transaction so readers never see a half-loaded database
+        with self.db.transaction():
+            # Clear existing data
+            self.clear_all_data()
+            
+            # Populate in dependency order
+            self.populate_sections()
+            self.populate_stations()
+            self.populate_trains()
+            self.populate_external_factors()
+            self.populate_incidents()
+            self.populate_decisions()
         
         print("Sample data population completed!")
     
     def clear_all_data(self):
         """Clear all existing data"""
-        tables = ['Decisions', 'Incidents', 'ExternalFactors', 'Station', 'Train', 'Section']
-        for table in tables:
-            self.db.execute_update(f"DELETE FROM {table}")
+        # SectionDailyStats goes last: deleting decisions and incidents updates it through triggers
+        tables = ['Decisions', 'Incidents', 'ExternalFactors', 'Station', 'Train', 'Section', 'SectionDailyStats']
+        with self.db.transaction():
+            for table in tables:
+                self.db.execute_update(f"DELETE FROM {table}")
+        # Reloaded decisions reuse the old ids, so the saved embeddings would no longer match them
+        from src.rag.retriever import remove_vector_index
+        remove_vector_index(self.db.db_path)
         print("Cleared existing data")
     
     def populate_sections(self):
@@ -42,12 +68,9 @@ class DataPopulator:
             (3, "SEC-C-Moradabad-Bareilly", "Double Line", "Low", "Free", "Power Block", "Manual Working", "Rain")
         ]
         
-        for data in sections_data:
-            query = '''INSERT INTO Section 
-                      (section_id, name, track_type, congestion_level, block_status, 
-                       power_status, signal_status, weather_condition) 
-                      VALUES (?, ?, ?, ?, ?, ?, ?, ?)'''
-            self.db.execute_insert(query, data)
+        columns = ['section_id', 'name', 'track_type', 'congestion_level', 'block_status',
+                   'power_status', 'signal_status', 'weather_condition']
+        self.db.bulk_insert('Section', columns, sections_data)
         print(f"Populated {len(sections_data)} sections")
     
     def populate_stations(self):
@@ -61,16 +84,13 @@ class DataPopulator:
             (302, 3, 3, 6, 1, None)
         ]
         
-        for data in stations_data:
-            query = '''INSERT INTO Station 
-                      (station_id, section_id, num_platforms, yard_capacity, 
-                       current_occupancy, special_facility) 
-                      VALUES (?, ?, ?, ?, ?, ?)'''
-            self.db.execute_insert(query, data)
+        columns = ['station_id', 'section_id', 'num_platforms', 'yard_capacity',
+                   'current_occupancy', 'special_facility']
+        self.db.bulk_insert('Station', columns, stations_data)
         print(f"Populated {len(stations_data)} stations")
     
     def populate_trains(self):
-        """Populate Train table with 15 trains"""
+        """Populate Train table with 15 trains, each placed in a section, block and (optionally) station"""
         trains_data = [
             # Superfast trains (Priority 1)
             (1001, "12951", "Superfast", 1, "On Time", 0, "Fresh Crew", "Good", None),
@@ -96,12 +116,12 @@ class DataPopulator:
             (4004, "FRT004", "Freight", 4, "On Time", 0, "Fresh Crew", "Good", None)
         ]
         
-        for data in trains_data:
-            query = '''INSERT INTO Train 
-                      (train_id, train_no, train_type, priority, current_status, 
-                       delay_minutes, crew_status, loco_health, linked_train_id) 
-                      VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)'''
-            self.db.execute_insert(query, data)
+        trains_data = [train + SAMPLE_TRAIN_PLACEMENTS[train[0]] for train in trains_data]
+        
+        columns = ['train_id', 'train_no', 'train_type', 'priority', 'current_status',
+                   'delay_minutes', 'crew_status', 'loco_health', 'linked_train_id',
+                   'current_section_id', 'current_block', 'current_station_id']
+        self.db.bulk_insert('Train', columns, trains_data)
         print(f"Populated {len(trains_data)} trains")
     
     def populate_external_factors(self):
@@ -112,11 +132,8 @@ class DataPopulator:
             (3, 3, "Natural Disaster", "Low", "Recent flooding cleared, track inspected and safe")
         ]
         
-        for data in factors_data:
-            query = '''INSERT INTO ExternalFactors 
-                      (factor_id, section_id, type, severity, remarks) 
-                      VALUES (?, ?, ?, ?, ?)'''
-            self.db.execute_insert(query, data)
+        columns = ['factor_id', 'section_id', 'type', 'severity', 'remarks']
+        self.db.bulk_insert('ExternalFactors', columns, factors_data)
         print(f"Populated {len(factors_data)} external factors")
     
     def populate_incidents(self):
@@ -129,11 +146,9 @@ class DataPopulator:
             (4, None, 3, "Fire", base_time + timedelta(hours=1, minutes=30), "Track-side fire extinguished, line clear")
         ]
         
-        for data in incidents_data:
-            query = '''INSERT INTO Incidents 
-                      (incident_id, train_id, section_id, type, timestamp, resolution) 
-                      VALUES (?, ?, ?, ?, ?, ?)'''
-            self.db.execute_insert(query, data)
+        columns = ['incident_id', 'train_id', 'section_id', 'type', 'timestamp',
+                   'resolution']
+        self.db.bulk_insert('Incidents', columns, incidents_data)
         print(f"Populated {len(incidents_data)} incidents")
     
     def populate_decisions(self):
@@ -152,11 +167,9 @@ class DataPopulator:
              base_time + timedelta(hours=2), "Resolved")
         ]
         
-        for data in decisions_data:
-            query = '''INSERT INTO Decisions 
-                      (decision_id, issue_id, section_id, controller_action, timestamp, outcome) 
-                      VALUES (?, ?, ?, ?, ?, ?)'''
-            self.db.execute_insert(query, data)
+        columns = ['decision_id', 'issue_id', 'section_id', 'controller_action',
+                   'timestamp', 'outcome']
+        self.db.bulk_insert('Decisions', columns, decisions_data)
         print(f"Populated {len(decisions_data)} decisions")
 
 if __name__ == "__main__":
@@ -3,73 +3,516 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.rag.retriever import RAGRetriever
-from src.rag.llm_manager import LLMManager
-from src.database.db_manager import DatabaseManager
+from src.database.db_manager import get_database_manager
+from src.decision_engine.keywords import KeywordExtractor
+from src.decision_engine.result_cache import DecisionResultCache
+from src.decision_engine.llm_guard import CircuitBreaker, PendingUpgrades
+from src.rag.llm_scheduler import SchedulerOverloaded, issue_priority, PRIORITY_NAMES
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterator, Optional, List, Tuple
 
 class DecisionEngine:
-    def __init__(self):
+    def __init__(self, 
+                 retrieval_mode: str = "keyword", 
+                 concurrent_retrieval: bool = True, 
+                 result_cache_ttl: Optional[float] = 300.0, 
+                 llm_timeout: Optional[float] = None,
+                 llm_backend=None):
+        # "keyword" uses the full-text index, "vector" the embedding index
+        self.retrieval_mode = retrieval_mode
+        # Run the snapshot and history retrieval side by side instead of one after the other
+        self.concurrent_retrieval = concurrent_retrieval
+        self._retrieval_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="decision-retrieval")
         self.retriever = RAGRetriever()
-        try:
-            self.llm_manager = LLMManager()
-            self.llm_available = True
-        except Exception as e:
-            print(f"Warning: LLM not available - {e}")
-            self.llm_available = False
+        # Latency budget for the LLM step in seconds (LLM_TIMEOUT_SECONDS); <= 0 waits indefinitely
+        if llm_timeout is None:
+            llm_timeout = float(os.getenv("LLM_TIMEOUT_SECONDS", "10"))
+        self.llm_timeout = llm_timeout
+        self.llm_breaker = CircuitBreaker()
+        # Calls that overran the budget, collectable later via get_suggestion_upgrade()
+        self.pending_upgrades = PendingUpgrades()
+        self._llm_status_counts: Dict[str, int] = {}
+        self._llm_status_lock = threading.Lock()
+        # The LLM stack (langchain, Gemini client) is imported and built on first use;
+        # llm_backend overrides the LLM_BACKEND choice (see src/rag/llm_backends.py)
+        self._llm_backend = llm_backend
+        self._llm_manager = None
+        self._llm_init_error: Optional[Exception] = None
+        self._llm_init_lock = threading.Lock()
         
-        self.db = DatabaseManager()
+        self.db = get_database_manager()
+        self.keyword_extractor = KeywordExtractor.from_database(self.db)
+        self._rule_engine = None
+        # Persisted cache of LLM-backed decision packages; None disables it
+        self.result_cache = DecisionResultCache(self.db, ttl_seconds=result_cache_ttl) \
+            if result_cache_ttl else None
+    
+    @property
+    def llm_manager(self):
+        """
+        The LLMManager, imported and constructed on first access; None if the
+        LLM cannot be used (e.g. no API key)
+        """
+        if self._llm_manager is None and self._llm_init_error is None:
+            with self._llm_init_lock:
+                if self._llm_manager is None and self._llm_init_error is None:
+                    try:
+                        from src.rag.llm_manager import LLMManager
+                        self._llm_manager = LLMManager(self._llm_backend)
+                    except Exception as e:
+                        print(f"Warning: LLM not available - {e}")
+                        self._llm_init_error = e
+        return self._llm_manager
+    
+    @property
+    def llm_available(self) -> bool:
+        return self.llm_manager is not None
+    
+    def llm_stats(self) -> Optional[Dict[str, Any]]:
+        """LLM call counters, or None while the LLM has not been loaded"""
+        return self._llm_manager.stats() if self._llm_manager is not None else None
+    
+    @property
+    def rule_engine(self):
+        """The rule-based fallback; built on first use since its module loads numpy when installed"""
+        if self._rule_engine is None:
+            from src.decision_engine.rules import RuleEngine
+            self._rule_engine = RuleEngine()
+        return self._rule_engine
     
     def make_decision(self, 
                      section_id: int, 
                      issue_description: str, 
-                     issue_type: Optional[str] = None) -> Dict[str, Any]:
+                     issue_type: Optional[str] = None, 
+                     profile: Optional[str] = None, 
+                     severity: Optional[str] = None) -> Dict[str, Any]:
         """
-        Main decision-making process
+        Main decision-making process. ``profile`` ("detailed" or "concise")
+        selects the prompt and context budget; None uses the LLM manager's default.
+        ``issue_type`` (an IncidentType value) and ``severity`` (a Severity value),
+        when reported, raise the LLM scheduling priority along with the issue keywords.
         """
         print(f"\n=== Processing Decision Request ===")
         print(f"Section: {section_id}")
         print(f"Issue: {issue_description}")
         
-        # Step 1: Gather current context
-        print("\n1. Gathering current context...")
-        current_context = self.retriever.get_current_section_snapshot(section_id)
+        # Step 0: Serve a cached analysis of the same issue against the same section state
+        current_context = None
+        cache_key = None
+        cache_info = None
+        history = None
+        if self.result_cache is not None:
+            if self.concurrent_retrieval:
+                # Search history while the snapshot and cache lookup run; a hit drops the search
+                history = self._start_history_search(issue_description)
+            current_context = self.retriever.get_current_section_snapshot(section_id)
+            cache_key = self.result_cache.make_key(
+                section_id, current_context, issue_description, self.retrieval_mode, profile
+            )
+            cached_package, cache_info = self.result_cache.lookup(cache_key)
+            if cached_package is not None:
+                print(f"⚡ Serving cached analysis ({cache_info['age_seconds']:.0f}s old)")
+                if history is not None:
+                    history[1].cancel()
+                cached_package['current_context'] = current_context
+                cached_package['cache'] = cache_info
+                return cached_package
         
-        # Step 2: Retrieve similar historical decisions
-        print("\n2. Retrieving similar historical decisions...")
-        keywords = self._extract_keywords(issue_description)
-        print(f"🔑 Extracted keywords: {keywords}")
-        historical_decisions = self.retriever.search_decisions_by_keywords(keywords, limit=5)
+        if self.concurrent_retrieval:
+            # Steps 1 and 2 run concurrently; only the LLM step needs both results
+            print("\n1-2. Gathering current context and similar historical decisions concurrently...")
+            current_context, keywords, historical_decisions, context_text = \
+                self._gather_context_concurrently(section_id, issue_description, current_context, profile, history)
+        else:
+            # Step 1: Gather current context
+            print("\n1. Gathering current context...")
+            if current_context is None:
+                current_context = self.retriever.get_current_section_snapshot(section_id)
+            
+            # Step 2: Retrieve similar historical decisions
+            print("\n2. Retrieving similar historical decisions...")
+            keywords = self._extract_keywords(issue_description)
+            print(f"🔑 Extracted keywords: {keywords}")
+            historical_decisions = self._retrieve_history(issue_description, keywords)
+            context_text = None
         
         # Step 3: Generate LLM suggestion (if available)
-        llm_suggestion = None
-        if self.llm_available:
-            print("\n3. Generating LLM suggestion...")
-            try:
-                llm_suggestion = self.llm_manager.generate_decision_suggestion(
-                    current_context, historical_decisions, issue_description
+        priority = self.classify_priority(issue_description, issue_type, severity)
+        llm_suggestion, llm_status, upgrade_id = self._generate_suggestion(
+            current_context, historical_decisions, issue_description, context_text, profile, priority
+        )
+        
+        # Step 4: Prepare decision package
+        decision_package = self._build_decision_package(
+            section_id, issue_description, current_context, historical_decisions, 
+            llm_suggestion, keywords, llm_status, upgrade_id
+        )
+        if self.result_cache is not None:
+            # Only LLM answers are worth caching; fallbacks are cheap and errors transient
+            if llm_status == "ok":
+                self.result_cache.store(cache_key, decision_package)
+            elif upgrade_id is not None:
+                self._cache_when_upgraded(cache_key, decision_package, upgrade_id)
+            decision_package['cache'] = cache_info
+        
+        print("4. Decision analysis complete!")
+        return decision_package
+    
+    def make_decisions(self, 
+                       batch: List[Dict[str, Any]], 
+                       max_concurrency: int = 4) -> List[Dict[str, Any]]:
+        """
+        Analyze many issues at once. Each item is a dict with 'section_id',
+        'issue_description' and optionally 'profile', 'issue_type' and 'severity'. Snapshots are fetched once per distinct section,
+        identical history searches run once, and LLM calls are dispatched with
+        at most ``max_concurrency`` in flight. Results come back in input order,
+        each with a 'timings' dict (milliseconds).
+        """
+        print(f"\n=== Processing Batch of {len(batch)} Decision Requests ===")
+        batch_start = time.perf_counter()
+        
+        # Step 1: One batched snapshot query for every distinct section
+        section_ids = list(dict.fromkeys(item['section_id'] for item in batch))
+        snapshots = self.retriever.get_section_snapshots(section_ids)
+        for section_id in section_ids:
+            if section_id not in snapshots:
+                # Unknown section: the single-section path reports it and returns an empty snapshot
+                snapshots[section_id] = self.retriever.get_current_section_snapshot(section_id)
+        
+        # Step 2: Deduplicated history searches, run side by side
+        keywords_per_item = [self._extract_keywords(item['issue_description']) for item in batch]
+        search_keys = [
+            item['issue_description'] if self.retrieval_mode == "vector" else tuple(sorted(keywords))
+            for item, keywords in zip(batch, keywords_per_item)
+        ]
+        history_futures = {}
+        for item, keywords, key in zip(batch, keywords_per_item, search_keys):
+            if key not in history_futures:
+                history_futures[key] = self._retrieval_executor.submit(
+                    self._retrieve_history, item['issue_description'], keywords
                 )
-                print("✅ LLM suggestion generated successfully")
-            except Exception as e:
-                print(f"❌ Error generating LLM suggestion: {e}")
-                llm_suggestion = "LLM suggestion unavailable due to error"
+        histories = {key: future.result() for key, future in history_futures.items()}
+        
+        retrieval_ms = (time.perf_counter() - batch_start) * 1000
+        print(f"📦 Batch retrieval: {len(section_ids)} sections, {len(history_futures)} distinct searches "
+              f"for {len(batch)} requests ({retrieval_ms:.0f} ms)")
+        
+        # Step 3: Suggestions with bounded concurrency
+        def analyze(index: int) -> Dict[str, Any]:
+            item = batch[index]
+            suggestion_start = time.perf_counter()
+            priority = self.classify_priority(item['issue_description'], item.get('issue_type'), item.get('severity'))
+            llm_suggestion, llm_status, upgrade_id = self._generate_suggestion(
+                snapshots[item['section_id']], histories[search_keys[index]],
+                item['issue_description'], profile=item.get('profile'), priority=priority
+            )
+            suggestion_ms = (time.perf_counter() - suggestion_start) * 1000
+            
+            decision_package = self._build_decision_package(
+                item['section_id'], item['issue_description'], snapshots[item['section_id']],
+                histories[search_keys[index]], llm_suggestion, keywords_per_item[index], 
+                llm_status, upgrade_id
+            )
+            decision_package['timings'] = {
+                'retrieval_ms': round(retrieval_ms, 1),
+                'suggestion_ms': round(suggestion_ms, 1),
+                'total_ms': round((time.perf_counter() - batch_start) * 1000, 1)
+            }
+            return decision_package
+        
+        with ThreadPoolExecutor(max_workers=max(1, max_concurrency), thread_name_prefix="decision-batch") as pool:
+            results = list(pool.map(analyze, range(len(batch))))
+        
+        print(f"✅ Batch analysis complete in {(time.perf_counter() - batch_start) * 1000:.0f} ms")
+        return results
+    
+    def stream_decision(self, 
+                        section_id: int, 
+                        issue_description: str, 
+                        profile: Optional[str] = None, 
+                        issue_type: Optional[str] = None, 
+                        severity: Optional[str] = None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Streaming variant of make_decision(). Yields (event, data) pairs:
+        "context" once retrieval is done (section snapshot, similar decisions,
+        keywords), then "token" for each piece of suggestion text as it
+        arrives, then "done" with the full suggestion and its llm_status.
+        Cached and rule-based answers arrive as a single token.
+        """
+        print(f"\n=== Streaming Decision Request ===")
+        print(f"Section: {section_id}")
+        print(f"Issue: {issue_description}")
+        
+        current_context = None
+        cache_key = None
+        cache_info = None
+        history = None
+        if self.result_cache is not None:
+            history = self._start_history_search(issue_description)
+            current_context = self.retriever.get_current_section_snapshot(section_id)
+            cache_key = self.result_cache.make_key(
+                section_id, current_context, issue_description, self.retrieval_mode, profile
+            )
+            cached_package, cache_info = self.result_cache.lookup(cache_key)
+            if cached_package is not None:
+                history[1].cancel()
+                print(f"⚡ Streaming cached analysis ({cache_info['age_seconds']:.0f}s old)")
+                cached_package['current_context'] = current_context
+                yield "context", self._stream_context_event(cached_package)
+                yield "token", {'text': cached_package['llm_suggestion']}
+                yield "done", {'llm_suggestion': cached_package['llm_suggestion'],
+                               'llm_status': cached_package['llm_status'], 'cache': cache_info}
+                return
+        
+        current_context, keywords, historical_decisions, context_text = \
+            self._gather_context_concurrently(section_id, issue_description, current_context, profile, history)
+        decision_package = self._build_decision_package(
+            section_id, issue_description, current_context, historical_decisions, "", keywords
+        )
+        yield "context", self._stream_context_event(decision_package)
+        
+        permit = self.llm_available and self.llm_breaker.allow_request()
+        if not permit:
+            llm_status = "unavailable" if not self.llm_available else "circuit_open"
+            llm_suggestion, llm_status, _ = self._fallback_suggestion(current_context, issue_description, llm_status)
+            yield "token", {'text': llm_suggestion}
+            yield "done", {'llm_suggestion': llm_suggestion, 'llm_status': llm_status, 'cache': cache_info}
+            return
+        
+        parts = []
+        priority = self.classify_priority(issue_description, issue_type, severity)
+        stream = self.llm_manager.stream_decision_suggestion(
+            current_context, historical_decisions, issue_description, 
+            context_text=context_text, profile=profile, priority=priority
+        )
+        try:
+            for text in stream:
+                parts.append(text)
+                yield "token", {'text': text}
+        except GeneratorExit:
+            # The client went away mid-stream; tokens already received show the provider is fine
+            if parts:
+                self.llm_breaker.record_success()
+            raise
+        except SchedulerOverloaded as e:
+            print(f"🚦 {e}, using rule-based fallback...")
+            llm_suggestion, llm_status, _ = self._fallback_suggestion(current_context, issue_description, "overloaded")
+            yield "token", {'text': llm_suggestion}
+            yield "done", {'llm_suggestion': llm_suggestion, 'llm_status': llm_status, 'cache': cache_info}
+            return
+        except Exception as e:
+            print(f"❌ Error streaming LLM suggestion: {e}")
+            self.llm_breaker.record_failure()
+            if parts:
+                # Keep what the controller has already seen rather than replacing it
+                self._count_llm_status("error")
+                yield "done", {'llm_suggestion': "".join(parts), 'llm_status': "error", 'cache': cache_info}
+                return
+            llm_suggestion, llm_status, _ = self._fallback_suggestion(current_context, issue_description, "error")
+            yield "token", {'text': llm_suggestion}
+            yield "done", {'llm_suggestion': llm_suggestion, 'llm_status': llm_status, 'cache': cache_info}
+            return
         else:
+            self.llm_breaker.record_success()
+        finally:
+            # Close the provider stream (freeing its scheduler slot) and, if no outcome was
+            # recorded (shed, or a disconnect before the first token), hand the trial back
+            stream.close()
+            self.llm_breaker.release_trial(permit)
+        
+        self._count_llm_status("ok")
+        decision_package.update(llm_suggestion="".join(parts), llm_status="ok")
+        if self.result_cache is not None:
+            self.result_cache.store(cache_key, decision_package)
+        yield "done", {'llm_suggestion': decision_package['llm_suggestion'], 'llm_status': "ok", 'cache': cache_info}
+    
+    def _stream_context_event(self, decision_package: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'section_id': decision_package['section_id'],
+            'issue_description': decision_package['issue_description'],
+            'timestamp': decision_package['timestamp'].isoformat(),
+            'current_context': decision_package['current_context'],
+            'historical_decisions': decision_package['historical_decisions'],
+            'keywords_used': decision_package['keywords_used']
+        }
+    
+    def _generate_suggestion(self, 
+                             current_context: Dict[str, Any], 
+                             historical_decisions: List[Dict[str, Any]], 
+                             issue_description: str,
+                             context_text: Optional[str] = None, 
+                             profile: Optional[str] = None, 
+                             priority: Optional[int] = None) -> Tuple[str, str, Optional[str]]:
+        """
+        Ask the LLM for a suggestion within the latency budget, or fall back to
+        the rule-based one. Returns (suggestion, llm_status, upgrade_id) where
+        llm_status is "ok", "timeout", "error", "overloaded" (shed by the LLM
+        scheduler), "circuit_open" or "unavailable". On timeout the LLM call
+        keeps its place in the queue or keeps running, and upgrade_id identifies
+        it for get_suggestion_upgrade().
+        """
+        if not self.llm_available:
             print("\n3. LLM unavailable, using rule-based fallback...")
-            llm_suggestion = self._generate_rule_based_suggestion(current_context, issue_description)
+            return self._fallback_suggestion(current_context, issue_description, "unavailable")
+        permit = self.llm_breaker.allow_request()
+        if not permit:
+            print("\n3. LLM skipped after repeated failures (circuit open), using rule-based fallback...")
+            return self._fallback_suggestion(current_context, issue_description, "circuit_open")
         
-        # Step 4: Prepare decision package
-        decision_package = {
+        if priority is None:
+            priority = self.classify_priority(issue_description)
+        print(f"\n3. Generating LLM suggestion ({PRIORITY_NAMES[priority]} priority)...")
+        try:
+            future = self.llm_manager.submit_decision_suggestion(
+                current_context, historical_decisions, issue_description, 
+                context_text=context_text, profile=profile, priority=priority
+            )
+            llm_suggestion = future.result(timeout=self.llm_timeout if self.llm_timeout > 0 else None)
+        except FuturesTimeoutError:
+            print(f"⏱️  LLM exceeded the {self.llm_timeout:.1f}s budget, using rule-based fallback...")
+            # Only a call that has had at least half the budget to itself counts against the
+            # provider; time spent queued behind more urgent requests says nothing about its health
+            started_at = getattr(future, 'started_at', None)
+            if started_at is not None and time.monotonic() - started_at >= self.llm_timeout / 2:
+                self.llm_breaker.record_failure()
+            suggestion, status, _ = self._fallback_suggestion(current_context, issue_description, "timeout")
+            return suggestion, status, self.pending_upgrades.add(future)
+        except SchedulerOverloaded as e:
+            print(f"🚦 {e}, using rule-based fallback...")
+            return self._fallback_suggestion(current_context, issue_description, "overloaded")
+        except Exception as e:
+            print(f"❌ Error generating LLM suggestion: {e}")
+            self.llm_breaker.record_failure()
+            return self._fallback_suggestion(current_context, issue_description, "error")
+        else:
+            # Before the finally, so a successful trial closes the breaker rather than handing the trial on
+            self.llm_breaker.record_success()
+        finally:
+            # Exits without a verdict (shed, or timed out while queued) must not hold the half-open trial
+            self.llm_breaker.release_trial(permit)
+        
+        self._count_llm_status("ok")
+        print("✅ LLM suggestion generated successfully")
+        return llm_suggestion, "ok", None
+    
+    def _fallback_suggestion(self, 
+                             current_context: Dict[str, Any], 
+                             issue_description: str, 
+                             llm_status: str) -> Tuple[str, str, Optional[str]]:
+        self._count_llm_status(llm_status)
+        return self._generate_rule_based_suggestion(current_context, issue_description), llm_status, None
+    
+    def _count_llm_status(self, llm_status: str):
+        with self._llm_status_lock:
+            self._llm_status_counts[llm_status] = self._llm_status_counts.get(llm_status, 0) + 1
+    
+    def llm_guard_stats(self) -> Dict[str, Any]:
+        """Outcome counts of the guarded LLM step, circuit breaker state and pending upgrades"""
+        with self._llm_status_lock:
+            outcomes = dict(self._llm_status_counts)
+        return {
+            'timeout_seconds': self.llm_timeout,
+            'outcomes': outcomes,
+            'circuit': self.llm_breaker.stats(),
+            'pending_upgrades': len(self.pending_upgrades)
+        }
+    
+    def get_suggestion_upgrade(self, upgrade_id: str) -> Dict[str, Any]:
+        """
+        State of an LLM call that overran its budget: "pending", "ready" (with
+        the suggestion), "failed" or "unknown" (never issued or expired)
+        """
+        future = self.pending_upgrades.get_future(upgrade_id)
+        if future is None:
+            return {'status': 'unknown'}
+        if not future.done():
+            return {'status': 'pending'}
+        if future.exception() is not None:
+            return {'status': 'failed', 'error': str(future.exception())}
+        return {'status': 'ready', 'llm_suggestion': future.result()}
+    
+    def _cache_when_upgraded(self, cache_key: str, decision_package: Dict[str, Any], upgrade_id: str):
+        """Cache the package with the late LLM answer once it arrives"""
+        future = self.pending_upgrades.get_future(upgrade_id)
+        if future is None:
+            return
+        
+        def store(done):
+            if done.cancelled() or done.exception() is not None:
+                return
+            try:
+                upgraded = dict(decision_package, llm_suggestion=done.result(), llm_status="ok", llm_upgrade_id=None)
+                self.result_cache.store(cache_key, upgraded)
+            except Exception as e:
+                print(f"Warning: could not cache upgraded suggestion - {e}")
+        
+        future.add_done_callback(store)
+    
+    def _build_decision_package(self, 
+                                section_id: int, 
+                                issue_description: str, 
+                                current_context: Dict[str, Any], 
+                                historical_decisions: List[Dict[str, Any]], 
+                                llm_suggestion: str, 
+                                keywords: list, 
+                                llm_status: str = "ok", 
+                                llm_upgrade_id: Optional[str] = None) -> Dict[str, Any]:
+        return {
             'section_id': section_id,
             'issue_description': issue_description,
             'current_context': current_context,
             'historical_decisions': historical_decisions,
             'llm_suggestion': llm_suggestion,
+            'llm_status': llm_status,
+            'llm_upgrade_id': llm_upgrade_id,
             'timestamp': datetime.now(),
             'keywords_used': keywords
         }
+    
+    def _retrieve_history(self, issue_description: str, keywords: List[str]) -> List[Dict[str, Any]]:
+        """
+        Retrieve similar historical decisions using the configured retrieval mode
+        """
+        if self.retrieval_mode == "vector":
+            return self.retriever.search_similar_decisions(issue_description, limit=5)
+        return self.retriever.search_decisions_by_keywords(keywords, limit=5)
+    
+    def _gather_context_concurrently(self, 
+                                     section_id: int, 
+                                     issue_description: str, 
+                                     current_context: Optional[Dict[str, Any]] = None, 
+                                     profile: Optional[str] = None,
+                                     history: Optional[Tuple[list, Future]] = None) -> Tuple[Dict[str, Any], list, List[Dict[str, Any]], Optional[str]]:
+        """
+        Fetch the section snapshot and the historical decisions on the retrieval pool.
+        The snapshot part of the prompt is formatted as soon as the snapshot arrives,
+        while the history search may still be running. A snapshot the caller
+        already holds is used as is, and so is a history search it already
+        started with _start_history_search().
+        """
+        snapshot_future = None
+        if current_context is None:
+            snapshot_future = self._retrieval_executor.submit(
+                self.retriever.get_current_section_snapshot, section_id
+            )
+        keywords, history_future = history or self._start_history_search(issue_description)
         
-        print("4. Decision analysis complete!")
-        return decision_package
+        if snapshot_future is not None:
+            current_context = snapshot_future.result()
+        context_text = None
+        if self.llm_available:
+            context_text = self.llm_manager.format_context(current_context, issue_description, profile)
+        historical_decisions = history_future.result()
+        return current_context, keywords, historical_decisions, context_text
+    
+    def _start_history_search(self, issue_description: str) -> Tuple[list, Future]:
+        """Extract the issue keywords and start the history search on the retrieval pool"""
+        keywords = self._extract_keywords(issue_description)
+        print(f"🔑 Extracted keywords: {keywords}")
+        return keywords, self._retrieval_executor.submit(self._retrieve_history, issue_description, keywords)
     
     def store_controller_decision(self, 
                                 decision_package: Dict[str, Any], 
@@ -91,6 +534,8 @@ class DecisionEngine:
              outcome)
         )
         
+        self.retriever.add_decision_embedding(decision_id, controller_action)
+        
         print(f"Stored decision with ID: {decision_id}")
         return decision_id
     
@@ -98,28 +543,8 @@ class DecisionEngine:
         """
         Extract keywords from issue description for similarity search
         """
-        # Simple keyword extraction - in production, this could be more sophisticated
-        keywords = []
-        
-        # Common railway operation keywords
-        railway_keywords = {
-            'delay': ['delay', 'late', 'behind'],
-            'priority': ['priority', 'urgent', 'superfast', 'express'],
-            'signal': ['signal', 'failure', 'fault'],
-            'power': ['power', 'electric', 'traction'],
-            'crew': ['crew', 'staff', 'driver'],
-            'freight': ['freight', 'goods', 'cargo'],
-            'passenger': ['passenger', 'people'],
-            'emergency': ['emergency', 'accident', 'incident'],
-            'maintenance': ['maintenance', 'repair', 'work'],
-            'weather': ['weather', 'fog', 'rain', 'storm']
-        }
-        
-        issue_lower = issue_description.lower()
-        
-        for category, terms in railway_keywords.items():
-            if any(term in issue_lower for term in terms):
-                keywords.append(category)
+        # Categories from the compiled whole-word vocabulary matcher
+        keywords = self.keyword_extractor.categories(issue_description)
         
         # Also add direct words from the description
         words = issue_description.split()
@@ -128,47 +553,32 @@ class DecisionEngine:
         
         return list(set(keywords))  # Remove duplicates
     
+    def classify_priority(self, 
+                          issue_description: str, 
+                          issue_type: Optional[str] = None, 
+                          severity: Optional[str] = None) -> int:
+        """
+        LLM scheduling priority from the issue's keywords and any reported
+        incident type and severity
+        """
+        categories = self.keyword_extractor.categories(issue_description)
+        return issue_priority(issue_description, categories, issue_type, severity)
+    
     def _generate_rule_based_suggestion(self, context: Dict[str, Any], issue_description: str) -> str:
         """
         Generate a basic rule-based suggestion when LLM is unavailable
         """
-        suggestions = []
-        
-        # Analyze current context
-        if 'section' in context:
-            section = context['section']
-            
-            # Signal-related issues
-            if 'signal' in issue_description.lower() and section['signal_status'] != 'Normal':
-                suggestions.append("Implement manual working procedures for signal failure")
-                suggestions.append("Coordinate with signal maintainer for immediate repair")
-            
-            # Power-related issues
-            if 'power' in issue_description.lower() and section['power_status'] != 'Normal':
-                suggestions.append("Coordinate with traction power controller")
-                suggestions.append("Arrange diesel locomotives if electric traction unavailable")
-            
-            # Congestion issues
-            if section['congestion_level'] == 'High':
-                suggestions.append("Priority to high-priority trains (Superfast/Express)")
-                suggestions.append("Hold freight trains at stations to clear mainline")
-            
-        # Train-specific suggestions
-        if 'trains' in context:
-            delayed_trains = [t for t in context['trains'] if t['current_status'] == 'Delayed']
-            if delayed_trains:
-                suggestions.append(f"Address {len(delayed_trains)} delayed trains - prioritize by train type")
-        
-        # Weather-related
-        if 'weather' in issue_description.lower():
-            suggestions.append("Implement speed restrictions if necessary")
-            suggestions.append("Increase vigilance for track safety")
-        
-        if not suggestions:
-            suggestions.append("Assess situation and coordinate with adjacent sections")
-            suggestions.append("Monitor train movements and update as situation develops")
+        return self.rule_engine.suggest(context, issue_description)
+    
+    def sweep_network(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Evaluate the rule table over every section at once and return the
+        sections that need attention, most severe first
+        """
+        from src.decision_engine.rules import SectionStateTable
         
-        return "RULE-BASED SUGGESTIONS:\n" + "\n".join(f"• {s}" for s in suggestions)
+        table = SectionStateTable.from_database(self.db)
+        return self.rule_engine.sweep(table, limit)
     
     def display_decision_analysis(self, decision_package: Dict[str, Any]):
         """
@@ -212,6 +622,8 @@ class DecisionEngine:
         
         # LLM Suggestion
         print(f"\nAI SUGGESTION:")
+        if decision_package.get('llm_status') == "timeout":
+            print(f"(LLM over the {self.llm_timeout:.0f}s budget - showing rule-based fallback)")
         print(decision_package['llm_suggestion'])
         
         print("="*60)
@@ -0,0 +1,216 @@
+import heapq
+import itertools
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional
+
+# Job states; "done" and "failed" are final
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+FINISHED = (DONE, FAILED)
+
+
+class JobQueueFull(RuntimeError):
+    """Too many analyses are waiting; the caller should retry later"""
+
+
+class _Job:
+    def __init__(self, job_id: str, request: Dict[str, Any], priority: int):
+        self.job_id = job_id
+        self.request = request
+        self.priority = priority
+        self.status = QUEUED
+        self.version = 0
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+
+    def view(self) -> Dict[str, Any]:
+        return {
+            'job_id': self.job_id,
+            'status': self.status,
+            'version': self.version,
+            'priority': self.priority,
+            'section_id': self.request['section_id'],
+            'issue_description': self.request['issue_description'],
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'result': self.result,
+            'error': self.error
+        }
+
+
+class JobManager:
+    """
+    Run decision analyses in the background so web requests return at once.
+
+    Submitted jobs wait in a queue ordered by the engine's LLM scheduling
+    priority (most urgent first, then oldest) and are worked off by
+    ``max_workers`` threads. Finished jobs stay readable for ``ttl_seconds``
+    and at most ``max_stored`` are kept, oldest first out; at most
+    ``max_pending`` may be queued or running at once. Callers poll get() or
+    block in wait()/subscribe() until a job changes.
+    """
+
+    def __init__(self, engine, max_workers: int = 32, ttl_seconds: float = 600.0,
+                 max_stored: int = 1000, max_pending: int = 1000):
+        self.engine = engine
+        self.max_workers = max(1, max_workers)
+        self.ttl_seconds = ttl_seconds
+        self.max_stored = max(1, max_stored)
+        self.max_pending = max(1, max_pending)
+        self._jobs: "OrderedDict[str, _Job]" = OrderedDict()
+        self._queue: List[tuple] = []
+        self._seq = itertools.count()
+        self._pending = 0
+        self._condition = threading.Condition()
+        self._workers: List[threading.Thread] = []
+        self.completed = 0
+        self.failed = 0
+        self.evicted = 0
+
+    def submit(self,
+               section_id: int,
+               issue_description: str,
+               issue_type: Optional[str] = None,
+               profile: Optional[str] = None,
+               severity: Optional[str] = None) -> str:
+        """Queue an analysis and return its job id"""
+        request = {
+            'section_id': section_id,
+            'issue_description': issue_description,
+            'issue_type': issue_type,
+            'profile': profile,
+            'severity': severity
+        }
+        priority = self.engine.classify_priority(issue_description, issue_type, severity)
+        job = _Job(uuid.uuid4().hex, request, priority)
+        with self._condition:
+            if self._pending >= self.max_pending:
+                raise JobQueueFull(f"{self._pending} analyses already pending")
+            self._prune()
+            self._jobs[job.job_id] = job
+            self._pending += 1
+            heapq.heappush(self._queue, (priority, next(self._seq), job))
+            self._ensure_workers()
+            self._condition.notify_all()
+        return job.job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Current state of a job, or None if it is unknown or has expired"""
+        with self._condition:
+            self._prune()
+            job = self._jobs.get(job_id)
+            return job.view() if job else None
+
+    def wait(self, job_id: str, timeout: Optional[float] = None,
+             after_version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Block until the job is finished (or, with ``after_version``, until it
+        changes past that version) or ``timeout`` runs out; returns its state
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while True:
+                job = self._jobs.get(job_id)
+                if job is None:
+                    return None
+                if job.status in FINISHED or (after_version is not None and job.version > after_version):
+                    return job.view()
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return job.view()
+                self._condition.wait(remaining)
+
+    def subscribe(self, job_id: str, heartbeat_seconds: float = 15.0) -> Iterator[Optional[Dict[str, Any]]]:
+        """
+        Yield the job's state now and after every change until it finishes;
+        yields None every ``heartbeat_seconds`` without a change (for keep-alives)
+        """
+        state = self.get(job_id)
+        if state is None:
+            return
+        yield state
+        while state['status'] not in FINISHED:
+            changed = self.wait(job_id, heartbeat_seconds, after_version=state['version'])
+            if changed is None:
+                return
+            if changed['version'] == state['version']:
+                yield None
+                continue
+            state = changed
+            yield state
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            self._prune()
+            statuses: Dict[str, int] = {}
+            for job in self._jobs.values():
+                statuses[job.status] = statuses.get(job.status, 0) + 1
+            return {
+                'workers': self.max_workers,
+                'pending': self._pending,
+                'stored': len(self._jobs),
+                'statuses': statuses,
+                'completed': self.completed,
+                'failed': self.failed,
+                'evicted': self.evicted
+            }
+
+    def _ensure_workers(self):
+        while len(self._workers) < self.max_workers:
+            worker = threading.Thread(target=self._work, name=f"decision-job-{len(self._workers)}", daemon=True)
+            self._workers.append(worker)
+            worker.start()
+
+    def _work(self):
+        while True:
+            with self._condition:
+                while not self._queue:
+                    self._condition.wait()
+                _, _, job = heapq.heappop(self._queue)
+                self._update(job, RUNNING, started_at=time.time())
+
+            try:
+                request = job.request
+                result = self.engine.make_decision(
+                    request['section_id'], request['issue_description'],
+                    issue_type=request['issue_type'], profile=request['profile'], severity=request['severity']
+                )
+            except Exception as e:
+                print(f"❌ Analysis job {job.job_id} failed: {e}")
+                with self._condition:
+                    self.failed += 1
+                    self._finish(job, FAILED, error=str(e))
+                continue
+            with self._condition:
+                self.completed += 1
+                self._finish(job, DONE, result=result)
+
+    def _finish(self, job: _Job, status: str, **fields):
+        self._pending -= 1
+        self._update(job, status, finished_at=time.time(), **fields)
+        self._prune()
+
+    def _update(self, job: _Job, status: str, **fields):
+        """Change a job's state and wake its waiters (called with the lock held)"""
+        job.status = status
+        for name, value in fields.items():
+            setattr(job, name, value)
+        job.version += 1
+        self._condition.notify_all()
+
+    def _prune(self):
+        """Drop expired finished jobs, then the oldest finished ones beyond max_stored (lock held)"""
+        cutoff = time.time() - self.ttl_seconds
+        finished = [job for job in self._jobs.values() if job.status in FINISHED]
+        excess = len(self._jobs) - self.max_stored
+        for job in finished:
+            if job.finished_at < cutoff or excess > 0:
+                del self._jobs[job.job_id]
+                self.evicted += 1
+                excess -= 1
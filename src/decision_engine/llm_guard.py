@@ -0,0 +1,129 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Dict, Optional
+
+
+class CircuitBreaker:
+    """
+    Skip a failing dependency for a while instead of waiting on it every time.
+
+    closed: calls go through; ``failure_threshold`` consecutive failures open it.
+    open: calls are refused until ``reset_timeout`` seconds have passed.
+    half-open: one trial call goes through; success closes, failure re-opens.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = "closed"
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        self.opened_count = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == "open" and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = "half-open"
+            self._trial_in_flight = False
+        return self._state
+
+    def allow_request(self):
+        """
+        Whether a call may go ahead: "closed" or "trial" (both truthy) if so,
+        False if not. A "trial" caller must end with record_success(),
+        record_failure() or release_trial().
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == "closed":
+                return "closed"
+            if state == "half-open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return "trial"
+            self.rejected += 1
+            return False
+
+    def release_trial(self, permit):
+        """
+        End a call without a verdict on the dependency (shed, abandoned, or
+        timed out before the dependency had a fair chance). If it was the
+        half-open trial, the next call may be the trial instead.
+        """
+        if permit != "trial":
+            return
+        with self._lock:
+            if self._state == "half-open":
+                self._trial_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self._state = "closed"
+            self._consecutive_failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._consecutive_failures += 1
+            if self._state == "half-open" or self._consecutive_failures >= self.failure_threshold:
+                if self._state != "open":
+                    self.opened_count += 1
+                self._state = "open"
+                self._opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'state': self._current_state(),
+                'consecutive_failures': self._consecutive_failures,
+                'opened_count': self.opened_count,
+                'rejected': self.rejected
+            }
+
+
+class PendingUpgrades:
+    """
+    LLM calls that overran the latency budget, kept so their answer can be
+    collected later. Bounded in size and age; the oldest entries go first.
+    """
+
+    def __init__(self, max_entries: int = 256, max_age_seconds: float = 600.0):
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, future: Future) -> str:
+        upgrade_id = uuid.uuid4().hex
+        with self._lock:
+            self._entries[upgrade_id] = (time.monotonic(), future)
+            self._prune()
+        return upgrade_id
+
+    def get_future(self, upgrade_id: str) -> Optional[Future]:
+        with self._lock:
+            self._prune()
+            entry = self._entries.get(upgrade_id)
+            return entry[1] if entry else None
+
+    def _prune(self):
+        cutoff = time.monotonic() - self.max_age_seconds
+        while self._entries:
+            oldest_id, (created_at, _) = next(iter(self._entries.items()))
+            if len(self._entries) <= self.max_entries and created_at >= cutoff:
+                break
+            del self._entries[oldest_id]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,108 @@
+import hashlib
+import json
+import re
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+# Bump when the shape of a decision package changes so old entries are ignored
+CACHE_FORMAT = 1
+
+# Keys that are not stored: the context is re-attached from the live snapshot
+_UNCACHED_KEYS = ('current_context', 'cache', 'timings')
+
+
+def normalize_issue(issue_description: str) -> str:
+    """Case, punctuation and whitespace-insensitive form of an issue description"""
+    return " ".join(re.findall(r"\w+", issue_description.lower()))
+
+
+def snapshot_fingerprint(snapshot: Dict[str, Any]) -> str:
+    """Content hash of a section snapshot; changes whenever any of its rows change"""
+    encoded = json.dumps(snapshot, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+class DecisionResultCache:
+    """
+    SQLite-backed cache of decision packages (the DecisionCache table).
+
+    Entries are keyed by the section snapshot's content fingerprint and the
+    normalized issue text, so any change to the section's state misses. Entries
+    older than ``ttl_seconds`` are ignored and purged, and the least recently
+    used entries are evicted beyond ``max_entries``. Being in the database, the
+    cache survives restarts and is shared by every process using the file.
+    """
+
+    def __init__(self, db, ttl_seconds: float = 300.0, max_entries: int = 1000):
+        self.db = db
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+    def make_key(self, section_id: int, snapshot: Dict[str, Any], issue_description: str,
+                 retrieval_mode: str = "keyword", profile: Optional[str] = None) -> str:
+        parts = [str(CACHE_FORMAT), str(section_id), retrieval_mode, profile or "default",
+                 snapshot_fingerprint(snapshot), normalize_issue(issue_description)]
+        return hashlib.sha256("\x1f".join(parts).encode('utf-8')).hexdigest()
+
+    def lookup(self, key: str) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Return (decision_package or None, cache info). The info dict is what
+        goes into decision_package['cache'].
+        """
+        rows = self.db.execute_query(
+            "SELECT package, created_at FROM DecisionCache WHERE cache_key = ?", (key,)
+        )
+        if not rows:
+            return None, {'hit': False, 'status': 'miss'}
+
+        now = time.time()
+        age = now - rows[0]['created_at']
+        if age > self.ttl_seconds:
+            self.db.execute_update("DELETE FROM DecisionCache WHERE cache_key = ?", (key,))
+            return None, {'hit': False, 'status': 'expired', 'age_seconds': round(age, 1)}
+
+        self.db.execute_update(
+            "UPDATE DecisionCache SET last_access = ?, hits = hits + 1 WHERE cache_key = ?", (now, key)
+        )
+        package = json.loads(rows[0]['package'])
+        package['timestamp'] = datetime.fromisoformat(package['timestamp'])
+        return package, {
+            'hit': True,
+            'status': 'hit',
+            'age_seconds': round(age, 1),
+            'expires_in_seconds': round(self.ttl_seconds - age, 1)
+        }
+
+    def store(self, key: str, decision_package: Dict[str, Any]):
+        """Save a package, then drop expired entries and trim to max_entries"""
+        package = {k: v for k, v in decision_package.items() if k not in _UNCACHED_KEYS}
+        package['timestamp'] = decision_package['timestamp'].isoformat()
+        encoded = json.dumps(package, default=str)
+        now = time.time()
+        with self.db.transaction():
+            self.db.execute_update('''
+                INSERT OR REPLACE INTO DecisionCache
+                    (cache_key, section_id, package, created_at, last_access, hits)
+                VALUES (?, ?, ?, ?, ?, 0)
+            ''', (key, decision_package['section_id'], encoded, now, now))
+            self.db.execute_update("DELETE FROM DecisionCache WHERE created_at < ?", (now - self.ttl_seconds,))
+            self.db.execute_update('''
+                DELETE FROM DecisionCache WHERE cache_key IN (
+                    SELECT cache_key FROM DecisionCache ORDER BY last_access DESC LIMIT -1 OFFSET ?
+                )
+            ''', (self.max_entries,))
+
+    def clear(self):
+        self.db.execute_update("DELETE FROM DecisionCache")
+
+    def stats(self) -> Dict[str, Any]:
+        rows = self.db.execute_query(
+            "SELECT COUNT(*) AS entries, COALESCE(SUM(hits), 0) AS hits FROM DecisionCache"
+        )
+        return {
+            'entries': rows[0]['entries'],
+            'hits': rows[0]['hits'],
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl_seconds
+        }
@@ -0,0 +1,313 @@
+import re
+import string
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    # Only the column-wise network sweep needs NumPy; single-section suggestions are pure Python
+    np = None
+
+# Per-section fields rules can test; strings come from Section, counts are aggregates
+STRING_FIELDS = ('name', 'track_type', 'congestion_level', 'block_status',
+                 'power_status', 'signal_status', 'weather_condition')
+COUNT_FIELDS = ('train_count', 'delayed_trains', 'halted_trains', 'max_delay_minutes',
+                'station_count', 'full_stations', 'factor_count', 'high_severity_factors',
+                'recent_incidents')
+
+# Conditions on this pseudo-field test the issue text instead of section state
+ISSUE_FIELD = 'issue'
+
+SECTIONS_STATE_QUERY = """
+    SELECT section_id, name, track_type, congestion_level, block_status,
+           power_status, signal_status, weather_condition
+    FROM Section ORDER BY section_id
+"""
+
+TRAIN_STATE_QUERY = """
+    SELECT current_section_id AS section_id,
+           COUNT(*) AS train_count,
+           SUM(current_status = 'Delayed') AS delayed_trains,
+           SUM(current_status = 'Halted') AS halted_trains,
+           MAX(delay_minutes) AS max_delay_minutes
+    FROM Train WHERE current_section_id IS NOT NULL
+    GROUP BY current_section_id
+"""
+
+STATION_STATE_QUERY = """
+    SELECT section_id, COUNT(*) AS station_count,
+           SUM(current_occupancy >= yard_capacity) AS full_stations
+    FROM Station GROUP BY section_id
+"""
+
+FACTOR_STATE_QUERY = """
+    SELECT section_id, COUNT(*) AS factor_count,
+           SUM(severity = 'High') AS high_severity_factors
+    FROM ExternalFactors GROUP BY section_id
+"""
+
+INCIDENT_STATE_QUERY = """
+    SELECT section_id, COUNT(*) AS recent_incidents
+    FROM Incidents WHERE timestamp > ?
+    GROUP BY section_id
+"""
+
+
+@dataclass(frozen=True)
+class Rule:
+    """
+    One row of the rule table: fires when all ``conditions`` hold.
+
+    A condition is ``(field, op, value)`` with op one of ==, !=, >, >=, <, <=,
+    in, or ``mentions`` (issue field only: a word starting with ``value``).
+    Actions are format strings over the section's fields.
+    """
+    name: str
+    conditions: Tuple[Tuple[str, str, Any], ...]
+    actions: Tuple[str, ...]
+    severity: int = 1
+
+
+DEFAULT_RULES = (
+    Rule('signal_failure',
+         (('issue', 'mentions', 'signal'), ('signal_status', '!=', 'Normal')),
+         ("Implement manual working procedures for signal failure",
+          "Coordinate with signal maintainer for immediate repair"),
+         severity=3),
+    Rule('power_failure',
+         (('issue', 'mentions', 'power'), ('power_status', '!=', 'Normal')),
+         ("Coordinate with traction power controller",
+          "Arrange diesel locomotives if electric traction unavailable"),
+         severity=3),
+    Rule('high_congestion',
+         (('congestion_level', '==', 'High'),),
+         ("Priority to high-priority trains (Superfast/Express)",
+          "Hold freight trains at stations to clear mainline"),
+         severity=2),
+    Rule('delayed_trains',
+         (('delayed_trains', '>', 0),),
+         ("Address {delayed_trains} delayed trains - prioritize by train type",),
+         severity=1),
+    Rule('weather',
+         (('issue', 'mentions', 'weather'),),
+         ("Implement speed restrictions if necessary",
+          "Increase vigilance for track safety"),
+         severity=2),
+)
+
+FALLBACK_ACTIONS = (
+    "Assess situation and coordinate with adjacent sections",
+    "Monitor train movements and update as situation develops",
+)
+
+
+def _not_equal(column: "np.ndarray", value) -> "np.ndarray":
+    # An unknown value (section row missing) is not evidence of an abnormal state
+    mask = column != value
+    if column.dtype.kind == 'U':
+        mask &= column != ''
+    return mask
+
+
+_OPS = {
+    '==': lambda column, value: column == value,
+    '!=': _not_equal,
+    '>': lambda column, value: column > value,
+    '>=': lambda column, value: column >= value,
+    '<': lambda column, value: column < value,
+    '<=': lambda column, value: column <= value,
+    'in': lambda column, value: np.isin(column, list(value)),
+}
+
+# The same operators on one section's Python values
+_SCALAR_OPS = dict(_OPS, **{
+    '!=': lambda field_value, value: field_value != value and field_value != '',
+    'in': lambda field_value, value: field_value in value,
+})
+
+
+def _snapshot_state(snapshot: Dict[str, Any], section_id: int = 0) -> Dict[str, Any]:
+    """One section's rule fields from a RAGRetriever section snapshot"""
+    section = snapshot.get('section') or {}
+    trains = snapshot.get('trains', [])
+    stations = snapshot.get('stations', [])
+    factors = snapshot.get('external_factors', [])
+    state = {name: section.get(name) or '' for name in STRING_FIELDS}
+    state.update({
+        'section_id': section.get('section_id', section_id),
+        'train_count': len(trains),
+        'delayed_trains': sum(1 for t in trains if t.get('current_status') == 'Delayed'),
+        'halted_trains': sum(1 for t in trains if t.get('current_status') == 'Halted'),
+        'max_delay_minutes': max((t.get('delay_minutes') or 0 for t in trains), default=0),
+        'station_count': len(stations),
+        'full_stations': sum(1 for s in stations
+                             if (s.get('current_occupancy') or 0) >= s.get('yard_capacity', 0)),
+        'factor_count': len(factors),
+        'high_severity_factors': sum(1 for f in factors if f.get('severity') == 'High'),
+        'recent_incidents': len(snapshot.get('recent_incidents', [])),
+    })
+    return state
+
+
+@dataclass
+class SectionStateTable:
+    """Columnar per-section state: one numpy array per field, aligned with section_ids"""
+    section_ids: "np.ndarray"
+    columns: Dict[str, "np.ndarray"] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.section_ids)
+
+    def row(self, index: int, fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Python values of one section's fields (all of them unless ``fields`` is given)"""
+        names = self.columns if fields is None else fields
+        values = {name: self.columns[name][index].item() for name in names if name in self.columns}
+        values['section_id'] = int(self.section_ids[index])
+        return values
+
+    @classmethod
+    def _from_rows(cls, section_rows: List[Dict[str, Any]],
+                   aggregates: Iterable[List[Dict[str, Any]]]) -> "SectionStateTable":
+        if np is None:
+            raise RuntimeError("Section state tables (the network sweep) need NumPy")
+        section_ids = np.array([row['section_id'] for row in section_rows], dtype=np.int64)
+        position = {int(section_id): i for i, section_id in enumerate(section_ids)}
+        table = cls(section_ids)
+        for name in STRING_FIELDS:
+            table.columns[name] = np.array([row.get(name) or '' for row in section_rows], dtype=str)
+        for name in COUNT_FIELDS:
+            table.columns[name] = np.zeros(len(section_ids), dtype=np.int64)
+        for rows in aggregates:
+            for row in rows:
+                i = position.get(row['section_id'])
+                if i is None:
+                    continue
+                for name, value in row.items():
+                    if name != 'section_id':
+                        table.columns[name][i] = value or 0
+        return table
+
+    @classmethod
+    def from_database(cls, db) -> "SectionStateTable":
+        """Load every section's state with one aggregate query per table"""
+        yesterday = datetime.now() - timedelta(days=1)
+        with db.read_transaction() as query:
+            sections = query(SECTIONS_STATE_QUERY)
+            aggregates = [query(TRAIN_STATE_QUERY), query(STATION_STATE_QUERY),
+                          query(FACTOR_STATE_QUERY), query(INCIDENT_STATE_QUERY, (yesterday,))]
+        return cls._from_rows(sections, aggregates)
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Dict[str, Any], section_id: int = 0) -> "SectionStateTable":
+        """Single-row table from a RAGRetriever section snapshot"""
+        state = _snapshot_state(snapshot, section_id)
+        section = {name: state[name] for name in STRING_FIELDS + ('section_id',)}
+        aggregate = {name: state[name] for name in COUNT_FIELDS + ('section_id',)}
+        return cls._from_rows([section], [[aggregate]])
+
+
+class _CompiledRule:
+    def __init__(self, rule: Rule):
+        self.rule = rule
+        self.state_conditions = []
+        self.scalar_conditions = []
+        self.issue_patterns = []
+        for field_name, op, value in rule.conditions:
+            if field_name == ISSUE_FIELD:
+                if op != 'mentions':
+                    raise ValueError(f"Rule {rule.name}: issue conditions only support 'mentions'")
+                self.issue_patterns.append(re.compile(rf"\b{re.escape(value)}", re.IGNORECASE))
+            elif field_name in STRING_FIELDS or field_name in COUNT_FIELDS:
+                if op not in _OPS:
+                    raise ValueError(f"Rule {rule.name}: unknown operator {op!r}")
+                self.state_conditions.append((field_name, _OPS[op], value))
+                self.scalar_conditions.append((field_name, _SCALAR_OPS[op], value))
+            else:
+                raise ValueError(f"Rule {rule.name}: unknown field {field_name!r}")
+        # Fields referenced by the action templates, fetched only when the rule fires
+        self.action_fields = {name for action in rule.actions
+                              for _, name, _, _ in string.Formatter().parse(action) if name}
+
+    def evaluate(self, table: SectionStateTable, issue: Optional[str]) -> "np.ndarray":
+        if issue is None:
+            # Network sweep: there is no issue text, so only state conditions count
+            if not self.state_conditions:
+                return np.zeros(len(table), dtype=bool)
+        elif not all(pattern.search(issue) for pattern in self.issue_patterns):
+            return np.zeros(len(table), dtype=bool)
+        mask = np.ones(len(table), dtype=bool)
+        for field_name, op, value in self.state_conditions:
+            mask &= op(table.columns[field_name], value)
+        return mask
+
+    def matches(self, state: Dict[str, Any], issue: str) -> bool:
+        """Whether the rule fires for one section's state (see _snapshot_state)"""
+        return (all(pattern.search(issue) for pattern in self.issue_patterns)
+                and all(op(state[field_name], value) for field_name, op, value in self.scalar_conditions))
+
+
+class RuleEngine:
+    """
+    Declarative rule-based fallback, compiled once and evaluated column-wise.
+
+    ``evaluate`` returns an (n_rules, n_sections) boolean matrix, so one call
+    covers every section in the division. ``suggest`` checks a single
+    section's snapshot in plain Python, so the last-resort fallback works
+    without NumPy.
+    """
+
+    def __init__(self, rules: Iterable[Rule] = DEFAULT_RULES,
+                 fallback_actions: Tuple[str, ...] = FALLBACK_ACTIONS):
+        self.rules = [_CompiledRule(rule) for rule in rules]
+        self.fallback_actions = fallback_actions
+
+    def evaluate(self, table: SectionStateTable, issue: Optional[str] = None) -> "np.ndarray":
+        if not self.rules:
+            return np.zeros((0, len(table)), dtype=bool)
+        return np.vstack([rule.evaluate(table, issue) for rule in self.rules])
+
+    def _actions(self, fired: "np.ndarray", table: SectionStateTable, index: int) -> List[str]:
+        actions = []
+        for rule, hit in zip(self.rules, fired):
+            if not hit:
+                continue
+            if rule.action_fields:
+                values = table.row(index, rule.action_fields)
+                actions.extend(action.format(**values) for action in rule.rule.actions)
+            else:
+                actions.extend(rule.rule.actions)
+        return actions
+
+    def suggest(self, context: Dict[str, Any], issue_description: str) -> str:
+        """Rule-based suggestion text for one section snapshot"""
+        state = _snapshot_state(context)
+        suggestions = []
+        for rule in self.rules:
+            if rule.matches(state, issue_description or ""):
+                suggestions.extend(action.format(**state) for action in rule.rule.actions)
+        suggestions = suggestions or list(self.fallback_actions)
+        return "RULE-BASED SUGGESTIONS:\n" + "\n".join(f"• {s}" for s in suggestions)
+
+    def sweep(self, table: SectionStateTable, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Sections with at least one firing rule, most severe first"""
+        fired = self.evaluate(table)
+        severities = np.array([rule.rule.severity for rule in self.rules], dtype=np.int64)
+        scores = severities @ fired if len(severities) else np.zeros(len(table), dtype=np.int64)
+        flagged = np.flatnonzero(scores)
+        # Highest score first; ties keep section order
+        flagged = flagged[np.argsort(-scores[flagged], kind='stable')]
+        if limit is not None:
+            flagged = flagged[:limit]
+        results = []
+        for index in flagged:
+            column = fired[:, index]
+            results.append({
+                'section_id': int(table.section_ids[index]),
+                'name': str(table.columns['name'][index]),
+                'score': int(scores[index]),
+                'rules': [rule.rule.name for rule, hit in zip(self.rules, column) if hit],
+                'suggestions': self._actions(column, table, index)
+            })
+        return results
@@ -79,6 +79,9 @@ class Train:
     crew_status: Optional[str] = None
     loco_health: Optional[str] = None
     linked_train_id: Optional[int] = None
+    current_section_id: Optional[int] = None
+    current_block: Optional[str] = None
+    current_station_id: Optional[int] = None
 
 @dataclass
 class Section:
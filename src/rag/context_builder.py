@@ -0,0 +1,254 @@
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+PRIORITY_NAMES = {1: "SUPERFAST", 2: "EXPRESS", 3: "PASSENGER", 4: "FREIGHT"}
+
+
+@dataclass(frozen=True)
+class ContextProfile:
+    """How much prompt context to build and how verbosely"""
+    name: str
+    context_chars: int
+    history_chars: int
+    max_history: int
+    action_chars: int
+    verbose: bool
+
+
+PROFILES = {
+    # Full section picture for comprehensive, section-wide plans
+    'detailed': ContextProfile('detailed', context_chars=6000, history_chars=700,
+                               max_history=3, action_chars=160, verbose=True),
+    # Just the trains and resources that matter, for short fast answers
+    'concise': ContextProfile('concise', context_chars=1200, history_chars=300,
+                              max_history=3, action_chars=80, verbose=False),
+}
+
+# Room kept for the "(+N more ... not shown)" note of each item kind
+_OMITTED_NOTE_CHARS = 40
+
+# Most of the item budget one kind may take in the first fill pass, so that a
+# long train list cannot crowd out a relevant station or incident. Whatever is
+# left afterwards goes to the best remaining items of any kind.
+KIND_SHARES = {'trains': 0.6, 'stations': 0.25, 'external factors': 0.15, 'incidents': 0.15}
+
+
+@dataclass
+class _Item:
+    kind: str
+    order: Tuple[int, int]  # (kind rank, position in the snapshot); the rendering order
+    score: float
+    headings: Tuple[str, ...]
+    line: str
+
+
+def _terms(text: str) -> Set[str]:
+    return set(re.findall(r"\w+", (text or "").lower()))
+
+
+class ContextBuilder:
+    """
+    Build the section-status and history parts of the LLM prompt within a
+    character budget.
+
+    Trains, stations, external factors and recent incidents are scored for
+    relevance to the issue (explicit mentions, train type, delays, crew and
+    loco problems, station occupancy, severity) and admitted greedily, best
+    first, while they fit. Admitted items are then rendered in their natural
+    order under their headings, with a note of how many were left out.
+    """
+
+    def __init__(self, profile: str = "detailed"):
+        self.profile = self.get_profile(profile)
+
+    @staticmethod
+    def get_profile(profile: Optional[str]) -> ContextProfile:
+        if profile is None:
+            return PROFILES['detailed']
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown context profile {profile!r}; expected one of {sorted(PROFILES)}")
+        return PROFILES[profile]
+
+    def build_context(self, context: Dict[str, Any], issue_description: str = "",
+                      profile: Optional[str] = None) -> str:
+        """Format a section snapshot, keeping the items most relevant to the issue"""
+        profile = self.get_profile(profile) if profile else self.profile
+        issue_lower = (issue_description or "").lower()
+        terms = _terms(issue_description)
+
+        lines = self._section_lines(context.get('section'), profile)
+        items = (self._train_items(context.get('trains') or [], issue_lower, terms, profile)
+                 + self._station_items(context.get('stations') or [], issue_lower, terms, profile)
+                 + self._factor_items(context.get('external_factors') or [], terms, profile)
+                 + self._incident_items(context.get('recent_incidents') or [], terms, profile))
+
+        kinds = {item.kind for item in items}
+        remaining = profile.context_chars - sum(len(line) + 1 for line in lines) \
+            - _OMITTED_NOTE_CHARS * len(kinds)
+
+        opened: Set[str] = set()
+        admitted: List[_Item] = []
+        # Positions in ranked, not the items: equal-valued items are still distinct rows
+        taken: Set[int] = set()
+        ranked = sorted(items, key=lambda i: (-i.score, i.order))
+        kind_budget = {kind: share * max(remaining, 0) for kind, share in KIND_SHARES.items()}
+        for capped in (True, False):
+            for position, item in enumerate(ranked):
+                if position in taken:
+                    continue
+                cost = len(item.line) + 1 + sum(len(h) + 1 for h in item.headings if h not in opened)
+                if cost > remaining or (capped and cost > kind_budget.get(item.kind, remaining)):
+                    continue
+                remaining -= cost
+                if capped and item.kind in kind_budget:
+                    kind_budget[item.kind] -= cost
+                opened.update(item.headings)
+                taken.add(position)
+                admitted.append(item)
+
+        shown: Dict[str, int] = {}
+        current_headings: Tuple[str, ...] = ()
+        for item in sorted(admitted, key=lambda i: i.order):
+            for depth, heading in enumerate(item.headings):
+                if depth >= len(current_headings) or current_headings[depth] != heading:
+                    lines.append(heading)
+            current_headings = item.headings
+            lines.append(item.line)
+            shown[item.kind] = shown.get(item.kind, 0) + 1
+
+        for kind in sorted(kinds):
+            omitted = sum(1 for item in items if item.kind == kind) - shown.get(kind, 0)
+            if omitted:
+                lines.append(f"  (+{omitted} more {kind} not shown)")
+
+        return "\n".join(lines)
+
+    def build_history(self, decisions: List[Dict[str, Any]], profile: Optional[str] = None) -> str:
+        """Format the similar past decisions (already ranked by the retriever) within budget"""
+        profile = self.get_profile(profile) if profile else self.profile
+        if not decisions:
+            return "No similar cases found."
+
+        formatted = []
+        remaining = profile.history_chars
+        for decision in decisions[:profile.max_history]:
+            action = decision['controller_action']
+            if len(action) > profile.action_chars:
+                action = action[:profile.action_chars] + "..."
+            line = f"{len(formatted) + 1}. {action} → {decision['outcome']}"
+            if len(line) + 1 > remaining:
+                break
+            remaining -= len(line) + 1
+            formatted.append(line)
+        return "\n".join(formatted) if formatted else "No similar cases found."
+
+    def _section_lines(self, section: Optional[Dict[str, Any]], profile: ContextProfile) -> List[str]:
+        if not section:
+            return []
+        lines = [f"Section: {section['name']} ({section['track_type']})",
+                 f"Infrastructure: Block={section['block_status']}, Power={section['power_status']}, "
+                 f"Signals={section['signal_status']}"]
+        if profile.verbose:
+            lines.append(f"Conditions: Weather={section['weather_condition']}, "
+                         f"Congestion={section['congestion_level']}")
+        else:
+            lines[-1] += f", Weather={section['weather_condition']}, Congestion={section['congestion_level']}"
+        return lines
+
+    def _train_items(self, trains, issue_lower: str, terms: Set[str], profile: ContextProfile) -> List[_Item]:
+        items = []
+        for order, train in enumerate(trains):
+            delay = train.get('delay_minutes') or 0
+            crew_issue = bool(train.get('crew_status')) and train['crew_status'] != 'Fresh Crew'
+            loco_issue = train.get('loco_health') in ('Poor', 'Fair')
+
+            score = 5 - (train.get('priority') or 4)
+            score += {'Delayed': 3, 'Halted': 4}.get(train.get('current_status'), 0)
+            score += min(delay, 120) / 30
+            score += (1 if crew_issue else 0) + {'Poor': 2, 'Fair': 1}.get(train.get('loco_health'), 0)
+            if train.get('train_no') and str(train['train_no']).lower() in issue_lower:
+                score += 20
+            if (train.get('train_type') or '').lower() in terms:
+                score += 3
+            if crew_issue and terms & {'crew', 'fatigue', 'driver', 'staff'}:
+                score += 3
+            if loco_issue and terms & {'loco', 'locomotive', 'engine', 'traction'}:
+                score += 3
+
+            if profile.verbose:
+                line = f"  • {train['train_no']} - {train['current_status']}"
+                if delay > 0:
+                    line += f" (Delayed +{delay}min)"
+                details = []
+                if crew_issue:
+                    details.append(f"Crew: {train['crew_status']}")
+                if loco_issue:
+                    details.append(f"Loco: {train['loco_health']}")
+                if details:
+                    line += f" [{', '.join(details)}]"
+                priority = train.get('priority')
+                headings = ("\nALL TRAINS IN SECTION:",
+                            f"\n{PRIORITY_NAMES.get(priority, 'OTHER')} TRAINS (Priority {priority}):")
+            else:
+                line = f"- {train['train_no']} ({train['train_type']}, P{train['priority']}): {train['current_status']}"
+                if delay > 0:
+                    line += f" +{delay}min"
+                if crew_issue or loco_issue:
+                    line += f", Crew: {train['crew_status']}, Loco: {train['loco_health']}"
+                headings = ("\nKey Trains:",)
+            items.append(_Item('trains', (0, order), score, headings, line))
+        return items
+
+    def _station_items(self, stations, issue_lower: str, terms: Set[str], profile: ContextProfile) -> List[_Item]:
+        items = []
+        for order, station in enumerate(stations):
+            capacity = station.get('yard_capacity') or 0
+            occupancy = station.get('current_occupancy') or 0
+            ratio = occupancy / capacity if capacity else 1.0
+            facility = station.get('special_facility')
+
+            score = 3 if ratio >= 1 else 1.5 if ratio >= 0.75 else 0.5
+            if facility:
+                score += 1 + 3 * len(_terms(facility) & terms)
+            if f"station {station['station_id']}" in issue_lower:
+                score += 20
+
+            if profile.verbose:
+                capacity_status = "FULL" if ratio >= 1 else "HIGH" if ratio >= 0.75 else "AVAILABLE"
+                line = f"  • Station {station['station_id']}: {occupancy}/{capacity} occupied ({capacity_status})"
+                if facility:
+                    line += f" - {facility}"
+                headings = ("\nSTATION RESOURCES & CAPACITY:",)
+            else:
+                line = f"- Station {station['station_id']}: {facility or 'No special facility'} ({occupancy}/{capacity})"
+                headings = ("\nResources:",)
+            items.append(_Item('stations', (1, order), score, headings, line))
+        return items
+
+    def _factor_items(self, factors, terms: Set[str], profile: ContextProfile) -> List[_Item]:
+        items = []
+        heading = "\nEXTERNAL FACTORS:" if profile.verbose else "\nExternal Factors:"
+        for order, factor in enumerate(factors):
+            score = {'High': 4, 'Medium': 2, 'Low': 1}.get(factor.get('severity'), 1)
+            score += 3 * len(_terms(factor.get('type')) & terms)
+            if profile.verbose:
+                line = f"  • {factor['type']} ({factor['severity']} severity): {factor.get('remarks')}"
+            else:
+                line = f"- {factor['type']} ({factor['severity']})"
+            items.append(_Item('external factors', (2, order), score, (heading,), line))
+        return items
+
+    def _incident_items(self, incidents, terms: Set[str], profile: ContextProfile) -> List[_Item]:
+        items = []
+        heading = "\nRECENT INCIDENTS:" if profile.verbose else "\nRecent Incidents:"
+        for order, incident in enumerate(incidents):
+            score = 3 + 3 * len(_terms(incident.get('type')) & terms)
+            if not incident.get('resolution'):
+                score += 2
+            line = f"  • {incident['type']}" if profile.verbose else f"- {incident['type']}"
+            if incident.get('train_id'):
+                line += f" (Train {incident['train_id']})"
+            line += f": {incident.get('resolution') or 'Under investigation'}"
+            items.append(_Item('incidents', (3, order), score, (heading,), line))
+        return items
@@ -0,0 +1,236 @@
+import os
+import re
+import threading
+import zlib
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class HashingEmbedder:
+    """
+    Offline text embedder: word and character n-gram features hashed into a
+    fixed number of buckets, sublinear term frequency, L2-normalised.
+
+    No vocabulary or model files are needed, so documents can be embedded one at
+    a time as they arrive. IDF weighting is applied at query time by the index,
+    which owns the document-frequency statistics.
+    """
+
+    def __init__(self, dim: int = 256, char_ngrams: Tuple[int, int] = (3, 5)):
+        self.dim = dim
+        self.char_ngrams = char_ngrams
+
+    def _features(self, text: str) -> List[str]:
+        words = re.findall(r"\w+", text.lower())
+        features = [f"w:{word}" for word in words]
+        features += [f"b:{a} {b}" for a, b in zip(words, words[1:])]
+        low, high = self.char_ngrams
+        for word in words:
+            padded = f" {word} "
+            for n in range(low, high + 1):
+                features += [padded[i:i + n] for i in range(len(padded) - n + 1)]
+        return features
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Embed texts into an (n, dim) float32 matrix of unit-length rows"""
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                # crc32 is stable across processes, unlike hash()
+                h = zlib.crc32(feature.encode("utf-8"))
+                # One hash bit picks a sign so that collisions tend to cancel out
+                matrix[row, h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        # Sublinear term frequency, then unit length so dot product is cosine similarity
+        matrix = np.sign(matrix) * np.log1p(np.abs(matrix))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (matrix / norms).astype(np.float32)
+
+
+class VectorIndex:
+    """
+    Dense-vector index over decision texts.
+
+    Vectors live in a contiguous float32 matrix. The saved part is memory-mapped
+    from ``<path_prefix>.vectors.npy``; rows added since the last save go to an
+    in-memory tail that grows by doubling. Search is a batched dot product
+    followed by an argpartition top-k, chunked so memory use stays bounded.
+
+    ``fingerprint`` summarises what was indexed (see ``text_checksum``) so
+    the owner can tell when the source rows changed under a saved index.
+    """
+
+    CHUNK_ROWS = 65536
+
+    def __init__(self, embedder: Optional[HashingEmbedder] = None, path_prefix: Optional[str] = None):
+        self.embedder = embedder or HashingEmbedder()
+        self.path_prefix = path_prefix
+        dim = self.embedder.dim
+        self._base = np.zeros((0, dim), dtype=np.float32)
+        self._base_ids = np.zeros(0, dtype=np.int64)
+        self._tail = np.zeros((1024, dim), dtype=np.float32)
+        self._tail_ids = np.zeros(1024, dtype=np.int64)
+        self._tail_count = 0
+        # Document frequency per bucket, for query-time IDF weighting
+        self._df = np.zeros(dim, dtype=np.float64)
+        self._checksum = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._base_ids) + self._tail_count
+
+    @property
+    def max_id(self) -> int:
+        """Highest id indexed so far (0 when empty)"""
+        with self._lock:
+            ids = [int(self._base_ids.max())] if len(self._base_ids) else []
+            if self._tail_count:
+                ids.append(int(self._tail_ids[:self._tail_count].max()))
+            return max(ids, default=0)
+
+    @property
+    def fingerprint(self) -> Tuple[int, int, int]:
+        """(documents, highest id, checksum of ids and text lengths)"""
+        with self._lock:
+            return len(self), self.max_id, self._checksum
+
+    def _paths(self):
+        return (f"{self.path_prefix}.vectors.npy",
+                f"{self.path_prefix}.ids.npy",
+                f"{self.path_prefix}.df.npy",
+                f"{self.path_prefix}.checksum.npy")
+
+    @classmethod
+    def remove(cls, path_prefix: str):
+        """Delete a saved index, so the next load starts empty"""
+        for path in cls(path_prefix=path_prefix)._paths():
+            if os.path.exists(path):
+                os.remove(path)
+
+    @classmethod
+    def load(cls, embedder: Optional[HashingEmbedder] = None, path_prefix: Optional[str] = None) -> "VectorIndex":
+        """Open a saved index (vectors memory-mapped), or an empty one if nothing is saved"""
+        index = cls(embedder, path_prefix)
+        if path_prefix is None:
+            return index
+        vectors_path, ids_path, df_path, checksum_path = index._paths()
+        if not all(os.path.exists(p) for p in (vectors_path, ids_path, df_path, checksum_path)):
+            return index
+        vectors = np.load(vectors_path, mmap_mode="r")
+        if vectors.shape[1] != index.embedder.dim:
+            # Saved with a different embedder configuration; rebuild from scratch
+            return index
+        index._base = vectors
+        index._base_ids = np.load(ids_path)
+        index._df = np.load(df_path)
+        index._checksum = int(np.load(checksum_path)[0])
+        return index
+
+    def save(self):
+        """Fold the tail into the base matrix and write it to disk"""
+        if self.path_prefix is None:
+            return
+        with self._lock:
+            vectors = np.concatenate([self._base, self._tail[:self._tail_count]])
+            ids = np.concatenate([self._base_ids, self._tail_ids[:self._tail_count]])
+            # Drop the memory map before its file is replaced
+            self._base, self._base_ids = vectors, ids
+            self._tail_count = 0
+            checksum = np.array([self._checksum], dtype=np.int64)
+            for path, array in zip(self._paths(), (vectors, ids, self._df, checksum)):
+                tmp_path = path + ".tmp.npy"
+                np.save(tmp_path, array)
+                os.replace(tmp_path, path)
+            self._base = np.load(self._paths()[0], mmap_mode="r")
+
+    def add(self, ids: Sequence[int], texts: Sequence[str]):
+        """Embed and append documents; safe to call while other threads search"""
+        if not ids:
+            return
+        vectors = self.embedder.embed(texts)
+        with self._lock:
+            needed = self._tail_count + len(ids)
+            if needed > len(self._tail_ids):
+                capacity = max(needed, 2 * len(self._tail_ids))
+                tail = np.zeros((capacity, self.embedder.dim), dtype=np.float32)
+                tail[:self._tail_count] = self._tail[:self._tail_count]
+                tail_ids = np.zeros(capacity, dtype=np.int64)
+                tail_ids[:self._tail_count] = self._tail_ids[:self._tail_count]
+                self._tail, self._tail_ids = tail, tail_ids
+            self._tail[self._tail_count:needed] = vectors
+            self._tail_ids[self._tail_count:needed] = ids
+            self._tail_count = needed
+            self._df += (vectors != 0).sum(axis=0)
+            self._checksum += text_checksum(ids, texts)
+
+    def _query_matrix(self, queries: Sequence[str]) -> np.ndarray:
+        n_docs = max(len(self), 1)
+        idf = (np.log((1.0 + n_docs) / (1.0 + self._df)) + 1.0).astype(np.float32)
+        q = self.embedder.embed(queries) * idf
+        norms = np.linalg.norm(q, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return q / norms
+
+    def search_batch(self, queries: Sequence[str], k: int = 5) -> List[List[Tuple[int, float]]]:
+        """Top-k (id, score) pairs for each query, best first"""
+        with self._lock:
+            blocks = [(self._base, self._base_ids),
+                      (self._tail[:self._tail_count], self._tail_ids[:self._tail_count])]
+            if not len(self) or not queries:
+                return [[] for _ in queries]
+            q = self._query_matrix(queries).T  # (dim, n_queries)
+
+        best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+        best_ids = np.zeros((len(queries), 0), dtype=np.int64)
+        for vectors, ids in blocks:
+            for start in range(0, len(ids), self.CHUNK_ROWS):
+                scores = (vectors[start:start + self.CHUNK_ROWS] @ q).T  # (n_queries, rows)
+                chunk_ids = ids[start:start + self.CHUNK_ROWS]
+                if scores.shape[1] > k:
+                    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+                    scores = np.take_along_axis(scores, top, axis=1)
+                    chunk_ids = chunk_ids[top]
+                else:
+                    chunk_ids = np.broadcast_to(chunk_ids, scores.shape)
+                best_scores = np.concatenate([best_scores, scores], axis=1)
+                best_ids = np.concatenate([best_ids, chunk_ids], axis=1)
+                if best_scores.shape[1] > k:
+                    top = np.argpartition(-best_scores, k - 1, axis=1)[:, :k]
+                    best_scores = np.take_along_axis(best_scores, top, axis=1)
+                    best_ids = np.take_along_axis(best_ids, top, axis=1)
+
+        results = []
+        for scores, ids in zip(best_scores, best_ids):
+            order = np.argsort(-scores)
+            results.append([(int(ids[i]), float(scores[i])) for i in order])
+        return results
+
+    def search(self, query: str, k: int = 5) -> List[Tuple[int, float]]:
+        """Top-k (id, score) pairs for a single query, best first"""
+        return self.search_batch([query], k)[0]
+
+
+def text_checksum(ids: Sequence[int], texts: Sequence[str]) -> int:
+    """
+    Order-independent checksum of (id, text) rows: the sum of
+    id * (text length + 1), which SQL can compute without fetching the text
+    """
+    return sum(int(row_id) * (len(text or "") + 1) for row_id, text in zip(ids, texts))
+
+
+def build_index(rows: Iterable[Tuple[int, str]], index: VectorIndex, batch_size: int = 4096) -> int:
+    """Add (id, text) rows to an index in batches; returns the number of rows added"""
+    added = 0
+    batch_ids, batch_texts = [], []
+    for row_id, text in rows:
+        batch_ids.append(row_id)
+        batch_texts.append(text or "")
+        if len(batch_ids) >= batch_size:
+            index.add(batch_ids, batch_texts)
+            added += len(batch_ids)
+            batch_ids, batch_texts = [], []
+    if batch_ids:
+        index.add(batch_ids, batch_texts)
+        added += len(batch_ids)
+    return added
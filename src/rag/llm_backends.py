@@ -0,0 +1,195 @@
+import os
+import hashlib
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Iterator, List, Optional
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+
+class LLMBackend(ABC):
+    """
+    A chat model that answers a (system prompt, human prompt) pair, either in
+    one piece or streamed piece by piece
+    """
+    name = "llm"
+
+    @abstractmethod
+    def invoke(self, system_prompt: str, human_prompt: str) -> str:
+        """The whole answer"""
+
+    @abstractmethod
+    def stream(self, system_prompt: str, human_prompt: str) -> Iterator[str]:
+        """The answer in pieces as they are produced"""
+
+
+class GeminiBackend(LLMBackend):
+    """Google Gemini through langchain"""
+    name = "Google Gemini"
+
+    def __init__(self, api_key: Optional[str] = None, model: str = "gemini-1.5-flash", temperature: float = 0.3):
+        self.api_key = api_key or os.getenv("GOOGLE_API_KEY")
+        if not self.api_key:
+            raise ValueError("GOOGLE_API_KEY not found in environment variables")
+
+        # langchain and the Gemini SDK take over a second to import, so they load here, not at module import
+        from langchain_google_genai import ChatGoogleGenerativeAI
+
+        self.llm = ChatGoogleGenerativeAI(
+            model=model,
+            google_api_key=self.api_key,
+            temperature=temperature,
+            convert_system_message_to_human=True
+        )
+
+    def invoke(self, system_prompt: str, human_prompt: str) -> str:
+        return self.llm.invoke(self._messages(system_prompt, human_prompt)).content
+
+    def stream(self, system_prompt: str, human_prompt: str) -> Iterator[str]:
+        for chunk in self.llm.stream(self._messages(system_prompt, human_prompt)):
+            if chunk.content:
+                yield chunk.content
+
+    def _messages(self, system_prompt: str, human_prompt: str) -> list:
+        from langchain.schema import HumanMessage, SystemMessage
+
+        return [
+            SystemMessage(content=system_prompt),
+            HumanMessage(content=human_prompt)
+        ]
+
+
+class FakeLLMError(RuntimeError):
+    """An injected failure of the fake backend"""
+
+
+class FakeLLMBackend(LLMBackend):
+    """
+    Local stand-in for load testing: no network and no quota.
+
+    Each call waits a time-to-first-token drawn from ``latency_distribution``
+    ("fixed", "uniform", "normal" or "lognormal" around ``latency_ms`` with
+    spread ``latency_jitter_ms``), then produces ``response_tokens`` words at
+    ``tokens_per_second``. ``failure_rate`` of calls raise FakeLLMError after
+    the first-token wait. The answer text depends only on the prompts, and
+    with a ``seed`` the timings and failures repeat from run to run.
+    """
+    name = "fake LLM"
+
+    DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal")
+
+    def __init__(self,
+                 latency_ms: float = 800.0,
+                 latency_jitter_ms: float = 200.0,
+                 latency_distribution: str = "normal",
+                 tokens_per_second: float = 60.0,
+                 response_tokens: int = 120,
+                 failure_rate: float = 0.0,
+                 seed: Optional[int] = None):
+        if latency_distribution not in self.DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution {latency_distribution!r}; "
+                             f"expected one of {list(self.DISTRIBUTIONS)}")
+        if not 0.0 <= failure_rate <= 1.0:
+            raise ValueError("failure_rate must be between 0 and 1")
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.latency_distribution = latency_distribution
+        self.tokens_per_second = tokens_per_second
+        self.response_tokens = response_tokens
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self.calls = 0
+        self.failures = 0
+
+    @classmethod
+    def from_env(cls) -> "FakeLLMBackend":
+        """Configure from FAKE_LLM_* environment variables"""
+        seed = os.getenv("FAKE_LLM_SEED")
+        return cls(
+            latency_ms=float(os.getenv("FAKE_LLM_LATENCY_MS", "800")),
+            latency_jitter_ms=float(os.getenv("FAKE_LLM_JITTER_MS", "200")),
+            latency_distribution=os.getenv("FAKE_LLM_LATENCY_DISTRIBUTION", "normal"),
+            tokens_per_second=float(os.getenv("FAKE_LLM_TOKENS_PER_SECOND", "60")),
+            response_tokens=int(os.getenv("FAKE_LLM_RESPONSE_TOKENS", "120")),
+            failure_rate=float(os.getenv("FAKE_LLM_FAILURE_RATE", "0")),
+            seed=int(seed) if seed else None
+        )
+
+    def invoke(self, system_prompt: str, human_prompt: str) -> str:
+        first_token_delay, fail = self._draw()
+        time.sleep(first_token_delay)
+        if fail:
+            raise FakeLLMError("Injected fake LLM failure")
+        tokens = self._response_tokens(system_prompt, human_prompt)
+        if self.tokens_per_second > 0:
+            time.sleep(len(tokens) / self.tokens_per_second)
+        return "".join(tokens)
+
+    def stream(self, system_prompt: str, human_prompt: str) -> Iterator[str]:
+        first_token_delay, fail = self._draw()
+        time.sleep(first_token_delay)
+        if fail:
+            raise FakeLLMError("Injected fake LLM failure")
+        for index, token in enumerate(self._response_tokens(system_prompt, human_prompt)):
+            if index and self.tokens_per_second > 0:
+                time.sleep(1.0 / self.tokens_per_second)
+            yield token
+
+    def stats(self) -> Dict[str, int]:
+        with self._random_lock:
+            return {'calls': self.calls, 'failures': self.failures}
+
+    def _draw(self):
+        """(time to first token in seconds, whether this call fails)"""
+        with self._random_lock:
+            mean, jitter = self.latency_ms, self.latency_jitter_ms
+            if self.latency_distribution == "fixed" or jitter <= 0:
+                latency = mean
+            elif self.latency_distribution == "uniform":
+                latency = self._random.uniform(mean - jitter, mean + jitter)
+            elif self.latency_distribution == "normal":
+                latency = self._random.gauss(mean, jitter)
+            else:
+                # Long right tail, median at latency_ms
+                latency = mean * self._random.lognormvariate(0.0, jitter / mean if mean > 0 else 0.0)
+            fail = self._random.random() < self.failure_rate
+            self.calls += 1
+            if fail:
+                self.failures += 1
+        return max(latency, 0.0) / 1000.0, fail
+
+    def _response_tokens(self, system_prompt: str, human_prompt: str) -> List[str]:
+        """A controller-style answer whose wording is fixed by the prompts"""
+        digest = hashlib.sha256(f"{system_prompt}\x00{human_prompt}".encode("utf-8")).hexdigest()
+        text = (f"[fake LLM response {digest[:12]}] "
+                "1. IMMEDIATE ACTION: Regulate approaching trains and hold lower priority services at the nearest loop. "
+                "2. REASONING: Higher priority trains keep their paths while the affected block is cleared. "
+                "3. EXPECTED OUTCOME: Normal working restored with minimal knock-on delay. ")
+        words = text.split()
+        filler = "Coordinate with adjacent section controllers and update the control chart.".split()
+        while len(words) < self.response_tokens:
+            words.extend(filler)
+        return [word + " " for word in words[:max(self.response_tokens, 1)]]
+
+
+BACKENDS = {
+    'gemini': GeminiBackend,
+    'fake': FakeLLMBackend.from_env,
+}
+
+
+def create_backend(name: Optional[str] = None) -> LLMBackend:
+    """
+    Build the backend named by ``name`` or the LLM_BACKEND environment
+    variable ("gemini", the default, or "fake")
+    """
+    name = (name or os.getenv("LLM_BACKEND") or "gemini").lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown LLM backend {name!r}; expected one of {sorted(BACKENDS)}")
+    return BACKENDS[name]()
@@ -1,39 +1,17 @@
-import os
-from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.schema import HumanMessage, SystemMessage
-from typing import List, Dict, Any
+import hashlib
+from concurrent.futures import Future
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 
-# Load environment variables
-load_dotenv()
+from src.rag.context_builder import ContextBuilder
+from src.rag.llm_backends import LLMBackend, create_backend
+from src.rag.llm_scheduler import LLMScheduler, NORMAL, PRIORITY_NAMES
+from src.rag.single_flight import SingleFlight
 
-class LLMManager:
-    def __init__(self):
-        self.api_key = os.getenv("GOOGLE_API_KEY")
-        if not self.api_key:
-            raise ValueError("GOOGLE_API_KEY not found in environment variables")
-        
-        self.llm = ChatGoogleGenerativeAI(
-            model="gemini-1.5-flash",
-            google_api_key=self.api_key,
-            temperature=0.3,
-            convert_system_message_to_human=True
-        )
-    
-    def generate_decision_suggestion(self, 
-                                   current_context: Dict[str, Any], 
-                                   historical_decisions: List[Dict[str, Any]], 
-                                   issue_description: str) -> str:
-        """
-        Generate decision suggestion based on current context and historical decisions
-        """
-        
-        print(f"\n🤖 LLM GENERATION - Preparing Input")
-        print("=" * 50)
-        print(f"📝 Issue: {issue_description}")
-        
-        # Prepare the system prompt - enhanced for detailed section-wide analysis
-        system_prompt = """You are an expert Railway Section Controller Supporter AI. Provide detailed, actionable railway operation decisions considering the ENTIRE section.
+# System prompt and human-prompt template per context profile (see ContextBuilder)
+PROMPTS = {
+    # Detailed section-wide analysis
+    'detailed': {
+        'system': """You are an expert Railway Section Controller Supporter AI. Provide detailed, actionable railway operation decisions considering the ENTIRE section.
 
 Priority Rules: Superfast (1) > Express (2) > Passenger (3) > Freight (4)
 Focus: Safety first, then section-wide efficiency.
@@ -51,26 +29,15 @@ Be specific about:
 - Station-by-station coordination 
 - Crew and locomotive movements
 - Impact on approaching trains
-- Traffic flow restoration sequence"""
-
-        # Prepare current context
-        context_text = self._format_current_context(current_context)
-        print(f"📊 Formatted context: {len(context_text)} characters")
-        
-        # Prepare historical decisions
-        historical_text = self._format_historical_decisions(historical_decisions)
-        print(f"📚 Historical context: {len(historical_text)} characters")
-        print(f"🔍 Using {len(historical_decisions)} historical decisions")
-        
-        # Create the human message - enhanced for comprehensive analysis
-        human_prompt = f"""
-INCIDENT: {issue_description}
+- Traffic flow restoration sequence""",
+        'human': """
+INCIDENT: {issue}
 
 COMPLETE SECTION STATUS:
-{context_text}
+{context}
 
 HISTORICAL CONTEXT:
-{historical_text}
+{history}
 
 INSTRUCTIONS:
 Analyze the ENTIRE section situation. Consider:
@@ -81,11 +48,84 @@ Analyze the ENTIRE section situation. Consider:
 5. Optimal sequence to restore normal operations
 
 Provide a comprehensive section controller decision with detailed coordination plan."""
+    },
+    # Short answers for speed
+    'concise': {
+        'system': """You are an expert Railway Section Controller AI. Provide CONCISE, actionable railway operation decisions.
+
+Priority Rules: Superfast (1) > Express (2) > Passenger (3) > Freight (4)
+Focus: Safety first, then efficiency.
+
+Response Format:
+1. IMMEDIATE ACTION (1-2 bullet points)
+2. REASONING (2-3 lines max)
+3. EXPECTED OUTCOME (1-2 lines)
+
+Be specific about train numbers, stations, and resources. Keep responses under 200 words.""",
+        'human': """
+SITUATION: {issue}
+
+SECTION STATUS:
+{context}
+
+PAST SOLUTIONS:
+{history}
 
-        messages = [
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=human_prompt)
-        ]
+Provide immediate railway controller decision following the format above."""
+    }
+}
+
+class LLMManager:
+    # Context profile used when a request does not choose one
+    default_profile = "detailed"
+    
+    def __init__(self, backend: Optional[LLMBackend] = None, scheduler: Optional[LLMScheduler] = None):
+        # Gemini unless LLM_BACKEND says otherwise (e.g. "fake" for offline load tests)
+        self.backend = backend if backend is not None else create_backend()
+        # Rate limit, concurrency cap and priority order for provider calls
+        self.scheduler = scheduler if scheduler is not None else LLMScheduler.from_env()
+        # Identical prompts issued concurrently share one Gemini call
+        self._single_flight = SingleFlight()
+        self.context_builder = ContextBuilder(self.default_profile)
+    
+    def generate_decision_suggestion(self, 
+                                   current_context: Dict[str, Any], 
+                                   historical_decisions: List[Dict[str, Any]], 
+                                   issue_description: str,
+                                   context_text: Optional[str] = None,
+                                   profile: Optional[str] = None,
+                                   priority: int = NORMAL) -> str:
+        """
+        Generate decision suggestion based on current context and historical decisions.
+        ``context_text`` is the output of format_context() when it was prepared ahead of time;
+        ``profile`` ("detailed" or "concise") picks the prompt and context budget.
+        """
+        content = self.submit_decision_suggestion(
+            current_context, historical_decisions, issue_description, context_text, profile, priority
+        ).result()
+        print(f"✅ LLM Response received: {len(content)} characters")
+        print("=" * 50)
+        return content
+    
+    def submit_decision_suggestion(self, 
+                                   current_context: Dict[str, Any], 
+                                   historical_decisions: List[Dict[str, Any]], 
+                                   issue_description: str,
+                                   context_text: Optional[str] = None,
+                                   profile: Optional[str] = None,
+                                   priority: int = NORMAL) -> Future:
+        """
+        Queue the LLM call with the scheduler at ``priority`` and return a
+        Future of the suggestion text
+        """
+        
+        print(f"\n🤖 LLM GENERATION - Preparing Input")
+        print("=" * 50)
+        print(f"📝 Issue: {issue_description}")
+        
+        system_prompt, human_prompt = self._build_prompts(
+            current_context, historical_decisions, issue_description, context_text, profile
+        )
         
         # Log the final prompt being sent to LLM
         print(f"\n📤 SENDING TO LLM:")
@@ -104,8 +144,8 @@ Provide a comprehensive section controller decision with detailed coordination p
             # Show priority distribution
             priority_counts = {}
             for train in current_context['trains']:
-                priority = train.get('priority', 'Unknown')
-                priority_counts[priority] = priority_counts.get(priority, 0) + 1
+                train_priority = train.get('priority', 'Unknown')
+                priority_counts[train_priority] = priority_counts.get(train_priority, 0) + 1
             print(f"   📊 Priority breakdown: {dict(priority_counts)}")
         
         if 'stations' in current_context:
@@ -118,98 +158,83 @@ Provide a comprehensive section controller decision with detailed coordination p
             print(f"   ⚠️  Recent incidents: {len(current_context['recent_incidents'])} incidents")
         
         print(f"   📚 Historical decisions: {len(historical_decisions)} similar cases")
-        print("\n🚀 Calling Google Gemini...")
+        print(f"\n🚀 Calling {self.backend.name} ({PRIORITY_NAMES.get(priority, priority)} priority)...")
         
-        # Generate response
-        response = self.llm.invoke(messages)
-        
-        print(f"✅ LLM Response received: {len(response.content)} characters")
-        print("=" * 50)
-        
-        return response.content
+        future, shared = self._submit_coalesced(system_prompt, human_prompt, priority)
+        if shared:
+            print("🔗 Sharing an identical in-flight LLM call")
+        return future
     
-    def _format_current_context(self, context: Dict[str, Any]) -> str:
-        """Format current context for LLM - enhanced for comprehensive analysis"""
-        formatted = []
-        
-        if 'section' in context:
-            section = context['section']
-            formatted.append(f"Section: {section['name']} ({section['track_type']})")
-            formatted.append(f"Infrastructure: Block={section['block_status']}, Power={section['power_status']}, Signals={section['signal_status']}")
-            formatted.append(f"Conditions: Weather={section['weather_condition']}, Congestion={section['congestion_level']}")
-        
-        if 'trains' in context and context['trains']:
-            # Show ALL trains with detailed status for comprehensive planning
-            formatted.append("\nALL TRAINS IN SECTION:")
-            
-            # Group by priority for better organization
-            trains_by_priority = {}
-            for train in context['trains']:
-                priority = train['priority']
-                if priority not in trains_by_priority:
-                    trains_by_priority[priority] = []
-                trains_by_priority[priority].append(train)
-            
-            # Display by priority groups
-            for priority in sorted(trains_by_priority.keys()):
-                trains = trains_by_priority[priority]
-                priority_name = {1: "SUPERFAST", 2: "EXPRESS", 3: "PASSENGER", 4: "FREIGHT"}[priority]
-                formatted.append(f"\n{priority_name} TRAINS (Priority {priority}):")
-                
-                for train in trains:
-                    status = f"  • {train['train_no']} - {train['current_status']}"
-                    if train['delay_minutes'] > 0:
-                        status += f" (Delayed +{train['delay_minutes']}min)"
-                    
-                    # Add crew and loco details for operational planning
-                    details = []
-                    if train['crew_status'] and train['crew_status'] != 'Fresh Crew':
-                        details.append(f"Crew: {train['crew_status']}")
-                    if train['loco_health'] and train['loco_health'] in ['Poor', 'Fair']:
-                        details.append(f"Loco: {train['loco_health']}")
-                    
-                    if details:
-                        status += f" [{', '.join(details)}]"
-                    
-                    formatted.append(status)
-        
-        if 'stations' in context and context['stations']:
-            formatted.append("\nSTATION RESOURCES & CAPACITY:")
-            for station in context['stations']:
-                occupancy_pct = (station['current_occupancy'] / station['yard_capacity']) * 100
-                capacity_status = "FULL" if occupancy_pct >= 100 else "HIGH" if occupancy_pct >= 75 else "AVAILABLE"
-                
-                station_info = f"  • Station {station['station_id']}: {station['current_occupancy']}/{station['yard_capacity']} occupied ({capacity_status})"
-                if station.get('special_facility'):
-                    station_info += f" - {station['special_facility']}"
-                formatted.append(station_info)
-        
-        # Add external factors for comprehensive planning
-        if 'external_factors' in context and context['external_factors']:
-            formatted.append("\nEXTERNAL FACTORS:")
-            for factor in context['external_factors']:
-                formatted.append(f"  • {factor['type']} ({factor['severity']} severity): {factor['remarks']}")
-        
-        # Add recent incidents for context
-        if 'recent_incidents' in context and context['recent_incidents']:
-            formatted.append("\nRECENT INCIDENTS:")
-            for incident in context['recent_incidents']:
-                incident_info = f"  • {incident['type']}"
-                if incident.get('train_id'):
-                    incident_info += f" (Train {incident['train_id']})"
-                incident_info += f": {incident.get('resolution', 'Under investigation')}"
-                formatted.append(incident_info)
+    def stream_decision_suggestion(self, 
+                                   current_context: Dict[str, Any], 
+                                   historical_decisions: List[Dict[str, Any]], 
+                                   issue_description: str,
+                                   context_text: Optional[str] = None,
+                                   profile: Optional[str] = None,
+                                   priority: int = NORMAL) -> Iterator[str]:
+        """
+        Same prompt as generate_decision_suggestion(), but yield the response
+        text piece by piece as the backend produces it
+        """
+        system_prompt, human_prompt = self._build_prompts(
+            current_context, historical_decisions, issue_description, context_text, profile
+        )
         
-        return "\n".join(formatted)
+        print(f"\n🚀 Streaming from {self.backend.name} ({len(system_prompt) + len(human_prompt)} characters of input)...")
+        received = 0
+        with self.scheduler.slot(priority):
+            for text in self.backend.stream(system_prompt, human_prompt):
+                received += len(text)
+                yield text
+        print(f"✅ LLM stream finished: {received} characters")
     
-    def _format_historical_decisions(self, decisions: List[Dict[str, Any]]) -> str:
-        """Format historical decisions for LLM - optimized for speed"""
-        if not decisions:
-            return "No similar cases found."
+    def _build_prompts(self, 
+                       current_context: Dict[str, Any], 
+                       historical_decisions: List[Dict[str, Any]], 
+                       issue_description: str,
+                       context_text: Optional[str] = None,
+                       profile: Optional[str] = None) -> Tuple[str, str]:
+        """Build the (system, human) prompt pair for a context profile"""
+        profile = profile or self.default_profile
+        prompts = PROMPTS[self.context_builder.get_profile(profile).name]
+        
+        # Prepare current context, ranked by relevance to the issue within the profile's budget
+        if context_text is None:
+            context_text = self.format_context(current_context, issue_description, profile)
+        print(f"📊 Formatted context ({profile}): {len(context_text)} characters")
         
-        # Only show most relevant decisions (max 3)
-        formatted = []
-        for i, decision in enumerate(decisions[:3], 1):
-            formatted.append(f"{i}. {decision['controller_action'][:80]}... → {decision['outcome']}")
+        # Prepare historical decisions
+        historical_text = self.context_builder.build_history(historical_decisions, profile)
+        print(f"📚 Historical context: {len(historical_text)} characters")
+        print(f"🔍 Using {len(historical_decisions)} historical decisions")
         
-        return "\n".join(formatted)
+        human_prompt = prompts['human'].format(issue=issue_description, context=context_text, history=historical_text)
+        return prompts['system'], human_prompt
+    
+    def _submit_coalesced(self, system_prompt: str, human_prompt: str, priority: int):
+        """
+        Schedule the LLM call, joining an identical call already queued or in
+        flight; returns (future, shared). A more urgent caller that joins a
+        queued call raises its priority, so it never waits behind it.
+        """
+        prompt_key = hashlib.sha256(f"{system_prompt}\x00{human_prompt}".encode("utf-8")).hexdigest()
+        future, shared = self._single_flight.submit(prompt_key, lambda: self.scheduler.submit(
+            lambda: self.backend.invoke(system_prompt, human_prompt), priority
+        ))
+        if shared:
+            self.scheduler.promote(future, priority)
+        return future, shared
+    
+    def stats(self) -> Dict[str, Any]:
+        """LLM call counters, including how many calls coalescing saved"""
+        stats = self._single_flight.stats()
+        stats['backend'] = self.backend.name
+        stats['scheduler'] = self.scheduler.stats()
+        return stats
+    
+    def format_context(self, 
+                       current_context: Dict[str, Any], 
+                       issue_description: str = "", 
+                       profile: Optional[str] = None) -> str:
+        """Format the section snapshot part of the prompt, e.g. while history is still being retrieved"""
+        return self.context_builder.build_context(current_context, issue_description, profile or self.default_profile)
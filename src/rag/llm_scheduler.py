@@ -0,0 +1,400 @@
+import os
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+from src.models.railway_models import IncidentType, Severity
+
+# Scheduling priorities; lower numbers are served first
+CRITICAL, HIGH, NORMAL, LOW = 0, 1, 2, 3
+PRIORITY_NAMES = {CRITICAL: "critical", HIGH: "high", NORMAL: "normal", LOW: "low"}
+
+INCIDENT_PRIORITY = {
+    IncidentType.ACCIDENT: CRITICAL,
+    IncidentType.DERAILMENT: CRITICAL,
+    IncidentType.FIRE: CRITICAL,
+    IncidentType.LEVEL_CROSSING: HIGH,
+    IncidentType.SECURITY: HIGH,
+    IncidentType.TECHNICAL_FAILURE: NORMAL,
+}
+
+SEVERITY_PRIORITY = {
+    Severity.HIGH: HIGH,
+    Severity.MEDIUM: NORMAL,
+    Severity.LOW: LOW,
+}
+
+# Keyword categories (see src/decision_engine/keywords.py) that raise an issue above normal
+CATEGORY_PRIORITY = {
+    'emergency': HIGH,
+    'signal': HIGH,
+    'power': HIGH,
+}
+
+# Words that mark an issue as one of the incident types, beyond the enum values themselves
+_INCIDENT_SYNONYMS = {
+    IncidentType.ACCIDENT: ["collision", "collided", "injured", "injuries", "casualty", "casualties", "fatality"],
+    IncidentType.DERAILMENT: ["derailed", "derail"],
+    IncidentType.FIRE: ["smoke", "blaze", "explosion", "burning"],
+    IncidentType.LEVEL_CROSSING: ["lc gate"],
+    IncidentType.SECURITY: ["bomb", "suspicious", "trespass", "trespasser"],
+}
+
+# Routine questions that may wait behind everything else
+_ROUTINE_PATTERN = re.compile(r"\b(?:congestion|congested|crowd|crowding|rush|festival|timetable|schedule|routine)\b",
+                              re.IGNORECASE)
+
+
+def _incident_pattern(incident_type: IncidentType) -> "re.Pattern":
+    terms = [incident_type.value] + _INCIDENT_SYNONYMS.get(incident_type, [])
+    alternation = "|".join(re.escape(term) for term in sorted(terms, key=len, reverse=True))
+    return re.compile(rf"\b(?:{alternation})(?:s|es)?\b", re.IGNORECASE)
+
+
+_INCIDENT_PATTERNS = [(incident_type, _incident_pattern(incident_type)) for incident_type in IncidentType]
+
+
+def _enum_member(enum_class, value):
+    if value is None or isinstance(value, enum_class):
+        return value
+    for member in enum_class:
+        if str(value).strip().lower() in (member.value.lower(), member.name.lower()):
+            return member
+    return None
+
+
+def issue_priority(issue_description: str,
+                   categories: Iterable[str] = (),
+                   incident_type: Union[IncidentType, str, None] = None,
+                   severity: Union[Severity, str, None] = None) -> int:
+    """
+    Scheduling priority of an analysis request: the most urgent of the
+    reported incident type and severity, incident types named in the issue
+    text and its keyword categories. Issues with none of these are normal,
+    or low when they read as routine (congestion, rush, timetable).
+    """
+    candidates = []
+    incident_type = _enum_member(IncidentType, incident_type)
+    if incident_type is not None:
+        candidates.append(INCIDENT_PRIORITY[incident_type])
+    severity = _enum_member(Severity, severity)
+    if severity is not None:
+        candidates.append(SEVERITY_PRIORITY[severity])
+
+    text = issue_description or ""
+    candidates.extend(INCIDENT_PRIORITY[incident] for incident, pattern in _INCIDENT_PATTERNS
+                      if pattern.search(text))
+    candidates.extend(CATEGORY_PRIORITY[category] for category in categories if category in CATEGORY_PRIORITY)
+
+    if candidates:
+        return min(candidates)
+    return LOW if _ROUTINE_PATTERN.search(text) else NORMAL
+
+
+class SchedulerOverloaded(RuntimeError):
+    """The request was shed because the scheduler queue is full"""
+
+
+class LLMCallTimeout(RuntimeError):
+    """The call ran past the scheduler's maximum running time and was abandoned"""
+
+
+class TokenBucket:
+    """
+    ``rate`` tokens per second, holding at most ``capacity``; a rate of 0 or
+    less never throttles. Not thread-safe on its own (the scheduler locks it).
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self) -> float:
+        """Seconds until a token is available"""
+        if self.rate <= 0:
+            return 0.0
+        self._refill()
+        return 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+
+    def take(self):
+        if self.rate > 0:
+            self._refill()
+            self._tokens -= 1
+
+
+@dataclass(eq=False)
+class _Job:
+    priority: int
+    seq: int
+    enqueued_at: float
+    grant: Callable[[], None]
+    future: Optional[Future] = None
+
+
+class LLMScheduler:
+    """
+    Admission control in front of the LLM provider.
+
+    Requests wait in a priority queue and are started at most
+    ``max_concurrency`` at a time and no faster than ``requests_per_minute``
+    (token bucket, bursts of ``burst``). The most urgent request goes first;
+    a request's priority improves by one level for every ``aging_seconds`` it
+    waits, so low-priority work still gets through. When ``max_queue``
+    requests are waiting, the least urgent one is shed with
+    SchedulerOverloaded. A call still running after ``max_run_seconds`` is
+    abandoned: its slot is freed and its Future fails with LLMCallTimeout,
+    so hung provider calls cannot take the scheduler down.
+    """
+
+    def __init__(self,
+                 max_concurrency: int = 4,
+                 requests_per_minute: float = 60.0,
+                 burst: Optional[int] = None,
+                 max_queue: int = 256,
+                 aging_seconds: float = 15.0,
+                 max_run_seconds: float = 60.0):
+        self.max_concurrency = max(1, max_concurrency)
+        self.requests_per_minute = requests_per_minute
+        self.max_queue = max(1, max_queue)
+        self.aging_seconds = aging_seconds
+        self.max_run_seconds = max_run_seconds
+        self._bucket = TokenBucket(requests_per_minute / 60.0,
+                                   burst if burst is not None else self.max_concurrency)
+        self._queue: List[_Job] = []
+        self._in_flight = 0
+        self._seq = 0
+        self._condition = threading.Condition()
+        self._dispatcher: Optional[threading.Thread] = None
+        self._counts = {priority: {'submitted': 0, 'started': 0, 'shed': 0, 'promoted': 0}
+                        for priority in PRIORITY_NAMES}
+        self._waits = {priority: deque(maxlen=1000) for priority in PRIORITY_NAMES}
+        self.throttled_seconds = 0.0
+        self.abandoned = 0
+
+    @classmethod
+    def from_env(cls) -> "LLMScheduler":
+        """
+        Configure from LLM_MAX_CONCURRENCY, LLM_REQUESTS_PER_MINUTE, LLM_BURST,
+        LLM_MAX_QUEUE and LLM_CALL_TIMEOUT_SECONDS
+        """
+        burst = os.getenv("LLM_BURST")
+        return cls(
+            max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "4")),
+            requests_per_minute=float(os.getenv("LLM_REQUESTS_PER_MINUTE", "60")),
+            burst=int(burst) if burst else None,
+            max_queue=int(os.getenv("LLM_MAX_QUEUE", "256")),
+            max_run_seconds=float(os.getenv("LLM_CALL_TIMEOUT_SECONDS", "60"))
+        )
+
+    def submit(self, fn: Callable[[], Any], priority: int = NORMAL) -> Future:
+        """
+        Queue ``fn`` to run on the scheduler's workers; the Future is pending
+        while queued, running once started, and fails with SchedulerOverloaded
+        if the request is shed or LLMCallTimeout if it runs too long
+        """
+        future = Future()
+
+        def grant():
+            # Lets callers tell time spent queued from time spent in the provider call
+            future.started_at = time.monotonic()
+            if not future.set_running_or_notify_cancel():
+                self._release()
+                return
+            release = self._lease(lambda: future.set_exception(LLMCallTimeout(
+                f"LLM call still running after {self.max_run_seconds:g}s")))
+            # A thread per call: an abandoned call keeps its thread, not a pooled worker
+            threading.Thread(target=run, args=(release,), name="llm-call", daemon=True).start()
+
+        def run(release):
+            try:
+                result = fn()
+            except BaseException as e:
+                if release():
+                    future.set_exception(e)
+            else:
+                if release():
+                    future.set_result(result)
+
+        self._enqueue(_Job(priority, 0, 0.0, grant, future))
+        return future
+
+    def promote(self, future: Future, priority: int) -> bool:
+        """
+        Raise a still-queued submit() call to ``priority`` if that is more
+        urgent, e.g. when an urgent caller joins it; returns whether it did
+        """
+        with self._condition:
+            for job in self._queue:
+                if job.future is future:
+                    if priority >= job.priority:
+                        return False
+                    job.priority = max(priority, CRITICAL)
+                    self._counts[job.priority]['promoted'] += 1
+                    self._condition.notify_all()
+                    return True
+        return False
+
+    @contextmanager
+    def slot(self, priority: int = NORMAL, timeout: Optional[float] = None):
+        """
+        Hold one scheduler slot for the duration of the block, e.g. while
+        consuming a stream; waits in the queue like submit()
+        """
+        granted = threading.Event()
+        job = _Job(priority, 0, 0.0, granted.set)
+        self._enqueue(job)
+        if not granted.wait(timeout):
+            with self._condition:
+                if job in self._queue:
+                    self._queue.remove(job)
+                    raise TimeoutError(f"No LLM slot within {timeout}s")
+            # Granted just as the wait ran out
+        if job.future is not None and job.future.done():
+            job.future.result()
+        release = self._lease()
+        try:
+            yield
+        finally:
+            release()
+
+    def _enqueue(self, job: _Job):
+        shed = None
+        with self._condition:
+            self._seq += 1
+            job.seq = self._seq
+            job.priority = min(max(job.priority, CRITICAL), LOW)
+            job.enqueued_at = time.monotonic()
+            self._counts[job.priority]['submitted'] += 1
+
+            if len(self._queue) >= self.max_queue:
+                worst = max(self._queue, key=lambda queued: (queued.priority, queued.seq))
+                shed = worst if worst.priority > job.priority else job
+                self._counts[shed.priority]['shed'] += 1
+                if shed is worst:
+                    self._queue.remove(worst)
+            if shed is not job:
+                self._queue.append(job)
+                self._ensure_dispatcher()
+                self._condition.notify_all()
+        if shed is not None:
+            # Outside the lock: failing the future runs its callbacks
+            self._shed(shed)
+
+    def _shed(self, job: _Job):
+        error = SchedulerOverloaded(f"LLM queue full ({self.max_queue} waiting); "
+                                    f"{PRIORITY_NAMES[job.priority]} request shed")
+        if job.future is not None:
+            job.future.set_exception(error)
+            return
+        # A slot() waiter: wake it with a failed future to raise from
+        job.future = Future()
+        job.future.set_running_or_notify_cancel()
+        job.future.set_exception(error)
+        job.grant()
+
+    def _ensure_dispatcher(self):
+        if self._dispatcher is None:
+            self._dispatcher = threading.Thread(target=self._dispatch_loop, name="llm-scheduler-dispatch", daemon=True)
+            self._dispatcher.start()
+
+    def _dispatch_loop(self):
+        while True:
+            with self._condition:
+                job = self._next_job()
+            job.grant()
+
+    def _next_job(self) -> _Job:
+        """Wait for a free slot and a rate token, then pop the most urgent job (called with the lock held)"""
+        while True:
+            self._queue = [job for job in self._queue if job.future is None or not job.future.done()]
+            if not self._queue or self._in_flight >= self.max_concurrency:
+                self._condition.wait()
+                continue
+            wait = self._bucket.wait_time()
+            if wait > 0:
+                # Re-pick afterwards: a more urgent request may arrive meanwhile
+                started = time.monotonic()
+                self._condition.wait(wait)
+                self.throttled_seconds += time.monotonic() - started
+                continue
+
+            now = time.monotonic()
+            aging = self.aging_seconds
+            job = min(self._queue, key=lambda queued: (
+                queued.priority - ((now - queued.enqueued_at) / aging if aging > 0 else 0), queued.seq))
+            self._queue.remove(job)
+            self._bucket.take()
+            self._in_flight += 1
+            self._counts[job.priority]['started'] += 1
+            self._waits[job.priority].append(now - job.enqueued_at)
+            return job
+
+    def _lease(self, on_expire: Optional[Callable[[], None]] = None) -> Callable[[], bool]:
+        """
+        Release function for a granted slot. It frees the slot on the first
+        call only and returns whether it did; after max_run_seconds a
+        watchdog frees it instead and calls ``on_expire``.
+        """
+        once = threading.Lock()
+        watchdog = None
+
+        def release() -> bool:
+            if not once.acquire(blocking=False):
+                return False
+            if watchdog is not None:
+                watchdog.cancel()
+            self._release()
+            return True
+
+        def expire():
+            if release():
+                with self._condition:
+                    self.abandoned += 1
+                print(f"Warning: LLM call still running after {self.max_run_seconds:g}s, releasing its slot")
+                if on_expire is not None:
+                    on_expire()
+
+        if self.max_run_seconds > 0:
+            watchdog = threading.Timer(self.max_run_seconds, expire)
+            watchdog.daemon = True
+            watchdog.start()
+        return release
+
+    def _release(self):
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, in-flight count and per-priority counts and queue waits"""
+        with self._condition:
+            by_priority = {}
+            for priority, name in PRIORITY_NAMES.items():
+                waits = sorted(self._waits[priority])
+                by_priority[name] = dict(
+                    self._counts[priority],
+                    queued=sum(1 for job in self._queue if job.priority == priority),
+                    wait_p50_ms=round(waits[len(waits) // 2] * 1000, 1) if waits else None,
+                    wait_p95_ms=round(waits[min(len(waits) - 1, int(len(waits) * 0.95))] * 1000, 1) if waits else None
+                )
+            return {
+                'max_concurrency': self.max_concurrency,
+                'requests_per_minute': self.requests_per_minute,
+                'queued': len(self._queue),
+                'in_flight': self._in_flight,
+                'throttled_seconds': round(self.throttled_seconds, 2),
+                'abandoned': self.abandoned,
+                'priorities': by_priority
+            }
@@ -1,65 +1,352 @@
 import sys
 import os
+import re
+import threading
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.database.db_manager import DatabaseManager
+from src.database.db_manager import get_database_manager
+from src.rag.snapshot_cache import SnapshotCache
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 
+# Tables a section snapshot is assembled from; a write to any of them invalidates cached snapshots
+SNAPSHOT_TABLES = ('Section', 'Train', 'Station', 'ExternalFactors', 'Incidents')
+
+# Snapshot cache key for the every-section result of get_section_snapshots()
+ALL_SECTIONS_KEY = '*'
+
+# Queries issued by the retriever. They live at module level so that
+# check_query_plans() explains exactly what the retriever executes.
+SECTION_QUERY = "SELECT * FROM Section WHERE section_id = ?"
+
+TRAINS_QUERY = """
+    SELECT * FROM Train 
+    WHERE current_section_id = ?
+    ORDER BY priority ASC, delay_minutes DESC
+"""
+
+STATIONS_QUERY = "SELECT * FROM Station WHERE section_id = ?"
+
+# What the vector index should cover: compared with VectorIndex.fingerprint
+# (the checksum matches src.rag.embeddings.text_checksum)
+DECISION_FINGERPRINT_QUERY = """
+    SELECT COUNT(*) AS row_count,
+           COALESCE(MAX(decision_id), 0) AS max_id,
+           COALESCE(SUM(decision_id * (COALESCE(LENGTH(controller_action), 0) + 1)), 0) AS checksum
+    FROM Decisions
+"""
+
+EXTERNAL_FACTORS_QUERY = "SELECT * FROM ExternalFactors WHERE section_id = ?"
+
+RECENT_INCIDENTS_QUERY = """
+    SELECT * FROM Incidents 
+    WHERE section_id = ? AND timestamp > ?
+    ORDER BY timestamp DESC
+"""
+
+# Sums at most one SectionDailyStats row per day of the window
+SECTION_METRICS_QUERY = """
+    SELECT COALESCE(SUM(train_reports), 0) as train_reports,
+           COALESCE(SUM(delay_minutes_total), 0) as delay_minutes_total,
+           COALESCE(SUM(on_time_reports), 0) as on_time_reports,
+           COALESCE(SUM(incidents), 0) as incidents,
+           COALESCE(SUM(resolved), 0) as resolved,
+           COALESCE(SUM(partially_resolved), 0) as partially_resolved,
+           COALESCE(SUM(escalated), 0) as escalated
+    FROM SectionDailyStats
+    WHERE section_id = ? AND bucket_date > ?
+"""
+
+SECTION_METRICS_TIMELINE_QUERY = """
+    SELECT * FROM SectionDailyStats
+    WHERE section_id = ? AND bucket_date > ?
+    ORDER BY bucket_date
+"""
+
+
+# Keep IN (...) lists well under SQLite's bound-parameter limit
+IN_CLAUSE_CHUNK = 500
+
+
+def _in_clause_chunks(ids: List[int]):
+    for start in range(0, len(ids), IN_CLAUSE_CHUNK):
+        yield ids[start:start + IN_CLAUSE_CHUNK]
+
+
+def _section_filter(column: str, id_count: Optional[int]) -> str:
+    """``column IN (?, ...)`` for id_count ids, or an always-true filter when fetching every section"""
+    if id_count is None:
+        return "1 = 1"
+    return f"{column} IN ({','.join('?' for _ in range(id_count))})"
+
+
+def _similar_decisions_query(prioritize_section: bool, limit: int) -> str:
+    query = """
+        SELECT d.*, s.name as section_name, s.track_type, s.congestion_level
+        FROM Decisions d
+        JOIN Section s ON d.section_id = s.section_id
+        WHERE d.controller_action LIKE ?
+    """
+    # If specific section provided, prioritize decisions from same section
+    if prioritize_section:
+        query += " ORDER BY CASE WHEN d.section_id = ? THEN 0 ELSE 1 END, d.timestamp DESC"
+    else:
+        query += " ORDER BY d.timestamp DESC"
+    return query + f" LIMIT {int(limit)}"
+
+
+def _keyword_search_query(keyword_count: int, limit: int,
+                          filter_section: bool = False, filter_outcome: bool = False) -> str:
+    # Create LIKE conditions for each keyword
+    conditions = "(" + " OR ".join(["controller_action LIKE ?" for _ in range(keyword_count)]) + ")"
+    if filter_section:
+        conditions += " AND d.section_id = ?"
+    if filter_outcome:
+        conditions += " AND d.outcome = ?"
+    return f"""
+        SELECT d.*, s.name as section_name
+        FROM Decisions d
+        JOIN Section s ON d.section_id = s.section_id
+        WHERE {conditions}
+        ORDER BY d.timestamp DESC
+        LIMIT {int(limit)}
+    """
+
+
+def _fts_similar_decisions_query(prioritize_section: bool, limit: int) -> str:
+    query = """
+        SELECT d.*, s.name as section_name, s.track_type, s.congestion_level,
+               bm25(DecisionsFTS) as relevance
+        FROM DecisionsFTS
+        JOIN Decisions d ON d.decision_id = DecisionsFTS.rowid
+        JOIN Section s ON d.section_id = s.section_id
+        WHERE DecisionsFTS MATCH ?
+    """
+    if prioritize_section:
+        query += " ORDER BY CASE WHEN d.section_id = ? THEN 0 ELSE 1 END, relevance"
+    else:
+        query += " ORDER BY relevance"
+    return query + f" LIMIT {int(limit)}"
+
+
+def _fts_keyword_search_query(filter_section: bool, filter_outcome: bool, limit: int) -> str:
+    # bm25() is lower for better matches, so ascending order is most relevant first
+    query = """
+        SELECT d.*, s.name as section_name, bm25(DecisionsFTS) as relevance
+        FROM DecisionsFTS
+        JOIN Decisions d ON d.decision_id = DecisionsFTS.rowid
+        JOIN Section s ON d.section_id = s.section_id
+        WHERE DecisionsFTS MATCH ?
+    """
+    if filter_section:
+        query += " AND d.section_id = ?"
+    if filter_outcome:
+        query += " AND d.outcome = ?"
+    return query + f" ORDER BY relevance LIMIT {int(limit)}"
+
+
+def _fts_match_expression(terms: List[str]) -> str:
+    """OR together every distinct word in ``terms``, quoted so FTS5 operators are taken literally"""
+    tokens = []
+    for term in terms:
+        for token in re.findall(r"\w+", term.lower()):
+            if len(token) > 2 and token not in tokens:
+                tokens.append(token)
+    return " OR ".join(f'"{token}"' for token in tokens)
+
+
+def _train_details_query(train_count: int) -> str:
+    placeholders = ",".join(["?" for _ in range(train_count)])
+    return f"""
+        SELECT * FROM Train
+        WHERE train_id IN ({placeholders})
+        ORDER BY priority ASC, delay_minutes DESC
+    """
+
+
+def _is_full_scan(plan_detail: str) -> bool:
+    """SCAN steps walk a whole table or a whole index; SEARCH steps seek into one"""
+    if "VIRTUAL TABLE INDEX" in plan_detail:
+        # Virtual tables (FTS5) are searched through the module's own index
+        return False
+    return plan_detail.startswith("SCAN ") and plan_detail != "SCAN CONSTANT ROW"
+
+
+def vector_index_path_prefix(db_path: str) -> Optional[str]:
+    """Where the decision vector index of a database file is saved (None for in-memory databases)"""
+    if db_path == ":memory:":
+        return None
+    return os.path.splitext(db_path)[0] + ".decisions"
+
+
+def remove_vector_index(db_path: str):
+    """Delete the saved decision vector index of a database, if there is one"""
+    path_prefix = vector_index_path_prefix(db_path)
+    if path_prefix is None:
+        return
+    try:
+        from src.rag.embeddings import VectorIndex
+    except ImportError:
+        # Without NumPy no index is ever saved
+        return
+    VectorIndex.remove(path_prefix)
+
+
 class RAGRetriever:
-    def __init__(self):
-        self.db = DatabaseManager()
+    def __init__(self, db=None):
+        self.db = db or get_database_manager()
+        self.fts_enabled = self.db.table_exists('DecisionsFTS')
+        self.snapshot_cache = SnapshotCache()
+        # Decision embedding index, loaded or built on first vector search
+        self._vector_index = None
+        self._vector_index_version = None
+        self._vector_index_lock = threading.Lock()
+        self.vector_search_available = True
     
-    def get_current_section_snapshot(self, section_id: int) -> Dict[str, Any]:
+    def get_current_section_snapshot(self, section_id: int, use_cache: bool = True) -> Dict[str, Any]:
         """
-        Get complete current snapshot of a section including all relevant data
+        Get complete current snapshot of a section including all relevant data.
+        Served from the snapshot cache until one of SNAPSHOT_TABLES is written.
         """
+        versions = self.db.table_versions(SNAPSHOT_TABLES)
+        if use_cache:
+            cached = self.snapshot_cache.get(section_id, versions)
+            if cached is not None:
+                print(f"\n⚡ RAG RETRIEVAL - Section Snapshot for ID: {section_id} (cached)")
+                return cached
+        
         print(f"\n🔍 RAG RETRIEVAL - Section Snapshot for ID: {section_id}")
         print("=" * 60)
         
+        # One read transaction on one connection gives a consistent point-in-time view
+        with self.db.read_transaction() as query:
+            snapshot = self._load_section_snapshot(query, section_id)
+        
+        print(f"✅ RAG snapshot complete - Total data points: {len(snapshot)}")
+        self.snapshot_cache.put(section_id, versions, snapshot)
+        return snapshot
+    
+    def _load_section_snapshot(self, query, section_id: int) -> Dict[str, Any]:
+        """
+        Assemble a section snapshot using ``query`` from DatabaseManager.read_transaction()
+        """
         snapshot = {}
         
         # Get section details
-        section_query = "SELECT * FROM Section WHERE section_id = ?"
-        section_data = self.db.execute_query(section_query, (section_id,))
+        section_data = query(SECTION_QUERY, (section_id,))
         if section_data:
             snapshot['section'] = section_data[0]
             print(f"📍 Section: {section_data[0].get('name', 'Unknown')} (Track: {section_data[0].get('track_type', 'N/A')}, Congestion: {section_data[0].get('congestion_level', 'N/A')})")
         else:
             print("❌ Section not found!")
         
-        # Get all trains in the section (simulated by getting trains of matching priority/type)
-        trains_query = """
-            SELECT * FROM Train 
-            ORDER BY priority ASC, delay_minutes DESC
-            LIMIT 10
-        """
-        snapshot['trains'] = self.db.execute_query(trains_query)
-        print(f"🚂 Retrieved {len(snapshot['trains'])} trains (ordered by priority)")
+        # Get all trains in the section
+        snapshot['trains'] = query(TRAINS_QUERY, (section_id,))
+        print(f"🚂 Retrieved {len(snapshot['trains'])} trains in section (ordered by priority)")
         
         # Get stations in the section
-        stations_query = "SELECT * FROM Station WHERE section_id = ?"
-        snapshot['stations'] = self.db.execute_query(stations_query, (section_id,))
+        snapshot['stations'] = query(STATIONS_QUERY, (section_id,))
         print(f"🚉 Retrieved {len(snapshot['stations'])} stations in section")
         
         # Get external factors affecting the section
-        external_factors_query = "SELECT * FROM ExternalFactors WHERE section_id = ?"
-        snapshot['external_factors'] = self.db.execute_query(external_factors_query, (section_id,))
+        snapshot['external_factors'] = query(EXTERNAL_FACTORS_QUERY, (section_id,))
         print(f"🌍 Retrieved {len(snapshot['external_factors'])} external factors")
         
         # Get recent incidents in the section (last 24 hours)
         yesterday = datetime.now() - timedelta(days=1)
-        incidents_query = """
-            SELECT * FROM Incidents 
-            WHERE section_id = ? AND timestamp > ?
-            ORDER BY timestamp DESC
-        """
-        snapshot['recent_incidents'] = self.db.execute_query(incidents_query, (section_id, yesterday))
+        snapshot['recent_incidents'] = query(RECENT_INCIDENTS_QUERY, (section_id, yesterday))
         print(f"⚠️  Retrieved {len(snapshot['recent_incidents'])} recent incidents (last 24h)")
         
-        print(f"✅ RAG snapshot complete - Total data points: {len(snapshot)}")
         return snapshot
     
+    def get_section_snapshots(self, section_ids: Optional[List[int]] = None) -> Dict[int, Dict[str, Any]]:
+        """
+        Get snapshots for many sections at once (every section when section_ids is None).
+        Uses a fixed number of IN (...) queries in one read transaction and groups rows
+        in Python, so the cost depends on the number of queries, not sections.
+        Sections that do not exist are left out of the result.
+        """
+        versions = self.db.table_versions(SNAPSHOT_TABLES)
+        if section_ids is None:
+            cached = self.snapshot_cache.get(ALL_SECTIONS_KEY, versions)
+            if cached is not None:
+                print(f"⚡ RAG BATCH RETRIEVAL - {len(cached)} sections (cached)")
+                return cached
+        
+        snapshots = {}
+        missing = None
+        if section_ids is not None:
+            missing = []
+            for section_id in dict.fromkeys(section_ids):
+                cached = self.snapshot_cache.get(section_id, versions)
+                if cached is not None:
+                    snapshots[section_id] = cached
+                else:
+                    missing.append(section_id)
+        
+        if missing is None or missing:
+            with self.db.read_transaction() as query:
+                built = self._load_section_snapshots(query, missing)
+            for section_id, snapshot in built.items():
+                self.snapshot_cache.put(section_id, versions, snapshot)
+            snapshots.update(built)
+            print(f"🔍 RAG BATCH RETRIEVAL - {len(built)} sections loaded, {len(snapshots) - len(built)} from cache")
+        
+        if section_ids is None:
+            snapshots = dict(sorted(snapshots.items()))
+            self.snapshot_cache.put(ALL_SECTIONS_KEY, versions, snapshots)
+            return snapshots
+        return {section_id: snapshots[section_id] for section_id in section_ids if section_id in snapshots}
+    
+    def _load_section_snapshots(self, query, section_ids: Optional[List[int]]) -> Dict[int, Dict[str, Any]]:
+        """
+        Assemble snapshots for ``section_ids`` (or all sections) with batched queries
+        """
+        id_chunks = [None] if section_ids is None else list(_in_clause_chunks(section_ids))
+        
+        def fetch(sql_template: str, extra_params: tuple = (), column: str = 'section_id') -> List[Dict[str, Any]]:
+            rows = []
+            for chunk in id_chunks:
+                sql = sql_template.format(filter=_section_filter(column, None if chunk is None else len(chunk)))
+                rows += query(sql, tuple(chunk or ()) + extra_params)
+            return rows
+        
+        snapshots = {}
+        for section in fetch("SELECT * FROM Section WHERE {filter} ORDER BY section_id"):
+            snapshots[section['section_id']] = {
+                'section': section,
+                'trains': [],
+                'stations': [],
+                'external_factors': [],
+                'recent_incidents': []
+            }
+        if not snapshots:
+            return snapshots
+        
+        trains_query = """
+            SELECT * FROM Train WHERE {filter}
+            ORDER BY priority ASC, delay_minutes DESC
+        """
+        for train in fetch(trains_query, column='current_section_id'):
+            snapshot = snapshots.get(train['current_section_id'])
+            if snapshot is not None:
+                snapshot['trains'].append(train)
+        
+        yesterday = datetime.now() - timedelta(days=1)
+        grouped = [
+            ('stations', "SELECT * FROM Station WHERE {filter}", ()),
+            ('external_factors', "SELECT * FROM ExternalFactors WHERE {filter}", ()),
+            ('recent_incidents',
+             "SELECT * FROM Incidents WHERE {filter} AND timestamp > ? ORDER BY timestamp DESC", (yesterday,)),
+        ]
+        for key, sql_template, extra_params in grouped:
+            for row in fetch(sql_template, extra_params):
+                snapshot = snapshots.get(row['section_id'])
+                if snapshot is not None:
+                    snapshot[key].append(row)
+        
+        return snapshots
+    
     def get_similar_historical_decisions(self, 
                                        issue_type: str, 
                                        section_id: Optional[int] = None,
@@ -67,82 +354,86 @@ class RAGRetriever:
         """
         Retrieve similar historical decisions based on issue type and section
         """
-        # Base query for historical decisions
-        query = """
-            SELECT d.*, s.name as section_name, s.track_type, s.congestion_level
-            FROM Decisions d
-            JOIN Section s ON d.section_id = s.section_id
-            WHERE d.controller_action LIKE ?
-        """
-        params = [f"%{issue_type}%"]
+        if self.fts_enabled:
+            match = _fts_match_expression([issue_type])
+            if not match:
+                return []
+            params = [match]
+            if section_id:
+                params.append(section_id)
+            return self.db.execute_query(_fts_similar_decisions_query(bool(section_id), limit), tuple(params))
         
-        # If specific section provided, prioritize decisions from same section
+        query = _similar_decisions_query(bool(section_id), limit)
+        params = [f"%{issue_type}%"]
         if section_id:
-            query += " ORDER BY CASE WHEN d.section_id = ? THEN 0 ELSE 1 END, d.timestamp DESC"
             params.append(section_id)
-        else:
-            query += " ORDER BY d.timestamp DESC"
-        
-        query += f" LIMIT {limit}"
         
         return self.db.execute_query(query, tuple(params))
     
     def get_section_performance_metrics(self, section_id: int, days: int = 7) -> Dict[str, Any]:
         """
-        Get performance metrics for a section over the last N days
+        Get performance metrics for a section over the last N days (today included),
+        read from the SectionDailyStats buckets that triggers keep up to date
         """
-        start_date = datetime.now() - timedelta(days=days)
+        start_bucket = (datetime.now() - timedelta(days=days)).date().isoformat()
+        totals = self.db.execute_query(SECTION_METRICS_QUERY, (section_id, start_bucket))[0]
         
         metrics = {}
         
-        # Get decision outcomes distribution
-        outcomes_query = """
-            SELECT outcome, COUNT(*) as count
-            FROM Decisions
-            WHERE section_id = ? AND timestamp > ?
-            GROUP BY outcome
-        """
-        outcomes = self.db.execute_query(outcomes_query, (section_id, start_date))
-        metrics['decision_outcomes'] = {outcome['outcome']: outcome['count'] for outcome in outcomes}
+        # Decision outcomes distribution
+        outcomes = {
+            'Resolved': totals['resolved'],
+            'Partially Resolved': totals['partially_resolved'],
+            'Escalated': totals['escalated']
+        }
+        metrics['decision_outcomes'] = {outcome: count for outcome, count in outcomes.items() if count}
         
-        # Get incident frequency
-        incidents_query = """
-            SELECT COUNT(*) as incident_count
-            FROM Incidents
-            WHERE section_id = ? AND timestamp > ?
-        """
-        incident_count = self.db.execute_query(incidents_query, (section_id, start_date))
-        metrics['recent_incidents'] = incident_count[0]['incident_count'] if incident_count else 0
+        # Incident frequency
+        metrics['recent_incidents'] = totals['incidents']
         
-        # Get average delay information (simulated)
-        # In real scenario, this would be calculated from actual train data
-        metrics['avg_delay_minutes'] = 25.5  # Placeholder
-        metrics['on_time_percentage'] = 73.2  # Placeholder
+        # Delay figures over every train status report in the window
+        reports = totals['train_reports']
+        metrics['train_reports'] = reports
+        metrics['avg_delay_minutes'] = round(totals['delay_minutes_total'] / reports, 1) if reports else 0.0
+        metrics['on_time_percentage'] = round(100.0 * totals['on_time_reports'] / reports, 1) if reports else 0.0
         
         return metrics
     
-    def search_decisions_by_keywords(self, keywords: List[str], limit: int = 10) -> List[Dict[str, Any]]:
+    def get_section_metrics_timeline(self, section_id: int, days: int = 30) -> List[Dict[str, Any]]:
         """
-        Search historical decisions by keywords in controller actions
+        Get the daily metric buckets for a section over the last N days
+        """
+        start_bucket = (datetime.now() - timedelta(days=days)).date().isoformat()
+        return self.db.execute_query(SECTION_METRICS_TIMELINE_QUERY, (section_id, start_bucket))
+    
+    def search_decisions_by_keywords(self, 
+                                     keywords: List[str], 
+                                     limit: int = 10,
+                                     section_id: Optional[int] = None,
+                                     outcome: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Search historical decisions by keywords in controller actions.
+        With the FTS index available, results come back in BM25 relevance order.
         """
         print(f"\n🔍 RAG HISTORICAL SEARCH")
         print("=" * 40)
         print(f"🔑 Keywords: {', '.join(keywords)}")
         
-        # Create LIKE conditions for each keyword
-        conditions = " OR ".join(["controller_action LIKE ?" for _ in keywords])
-        params = [f"%{keyword}%" for keyword in keywords]
-        
-        query = f"""
-            SELECT d.*, s.name as section_name
-            FROM Decisions d
-            JOIN Section s ON d.section_id = s.section_id
-            WHERE {conditions}
-            ORDER BY d.timestamp DESC
-            LIMIT {limit}
-        """
+        if self.fts_enabled:
+            match = _fts_match_expression(keywords)
+            has_terms = bool(match)
+            query = _fts_keyword_search_query(section_id is not None, outcome is not None, limit)
+            params = [match]
+        else:
+            has_terms = bool(keywords)
+            query = _keyword_search_query(len(keywords), limit, section_id is not None, outcome is not None)
+            params = [f"%{keyword}%" for keyword in keywords]
+        if section_id is not None:
+            params.append(section_id)
+        if outcome is not None:
+            params.append(outcome)
         
-        results = self.db.execute_query(query, tuple(params))
+        results = self.db.execute_query(query, tuple(params)) if has_terms else []
         print(f"📊 Found {len(results)} historical decisions")
         
         for i, decision in enumerate(results[:3], 1):  # Log first 3 decisions
@@ -154,6 +445,113 @@ class RAGRetriever:
         print("✅ Historical search complete")
         return results
     
+    def get_vector_index(self):
+        """
+        Load the decision embedding index on first use and keep it in step with
+        the Decisions table: new decisions are embedded, and if rows were
+        deleted or rewritten (e.g. the sample data was reloaded) the index is
+        rebuilt. Returns None when NumPy is unavailable.
+        """
+        if not self.vector_search_available:
+            return None
+        if self._vector_index is not None and self._vector_index_version == self.db.table_versions(('Decisions',)):
+            return self._vector_index
+        
+        with self._vector_index_lock:
+            # Read before syncing, so a write that lands meanwhile triggers another check
+            version = self.db.table_versions(('Decisions',))
+            if self._vector_index is None or self._vector_index_version != version:
+                try:
+                    from src.rag.embeddings import VectorIndex, build_index
+                except ImportError as e:
+                    print(f"Warning: vector search not available - {e}")
+                    self.vector_search_available = False
+                    return None
+                
+                index = self._vector_index
+                if index is None:
+                    index = VectorIndex.load(path_prefix=vector_index_path_prefix(self.db.db_path))
+                self._vector_index = self._sync_vector_index(index, VectorIndex, build_index)
+                self._vector_index_version = version
+        return self._vector_index
+    
+    def _sync_vector_index(self, index, index_class, build_index):
+        """Bring ``index`` up to date with Decisions; returns it or its rebuilt replacement"""
+        with self.db.read_transaction() as query:
+            expected = tuple(query(DECISION_FINGERPRINT_QUERY)[0].values())
+            if index.fingerprint == expected:
+                return index
+            
+            new_rows = query(
+                "SELECT decision_id, controller_action FROM Decisions WHERE decision_id > ? ORDER BY decision_id",
+                (index.max_id,)
+            )
+            added = build_index(((row['decision_id'], row['controller_action']) for row in new_rows), index)
+            rebuilt = index.fingerprint != expected
+            if rebuilt:
+                # Rows were deleted or changed, possibly under reused ids; start over
+                index = index_class(index.embedder, index.path_prefix)
+                all_rows = query("SELECT decision_id, controller_action FROM Decisions ORDER BY decision_id")
+                added = build_index(((row['decision_id'], row['controller_action']) for row in all_rows), index)
+        
+        index.save()
+        print(f"🧭 Vector index ready: {len(index)} decisions "
+              f"({'rebuilt' if rebuilt else f'{added} newly embedded'})")
+        return index
+    
+    def add_decision_embedding(self, decision_id: int, controller_action: str):
+        """
+        Add a newly stored decision to the vector index (if it has been loaded)
+        """
+        with self._vector_index_lock:
+            # A sync since the insert may have embedded it already
+            if self._vector_index is not None and decision_id > self._vector_index.max_id:
+                self._vector_index.add([decision_id], [controller_action])
+    
+    def search_similar_decisions(self, 
+                                 issue_description: str, 
+                                 limit: int = 5,
+                                 section_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Find historical decisions by embedding similarity to the issue description
+        """
+        index = self.get_vector_index()
+        if index is None:
+            return self.search_decisions_by_keywords([issue_description], limit, section_id=section_id)
+        
+        print(f"\n🧭 RAG VECTOR SEARCH")
+        print("=" * 40)
+        
+        # Over-fetch when filtering by section so the filter still leaves enough rows
+        hits = index.search(issue_description, k=limit if section_id is None else limit * 4)
+        if not hits:
+            print("📊 Found 0 similar decisions")
+            return []
+        
+        placeholders = ",".join(["?" for _ in hits])
+        rows = self.db.execute_query(f"""
+            SELECT d.*, s.name as section_name
+            FROM Decisions d
+            JOIN Section s ON d.section_id = s.section_id
+            WHERE d.decision_id IN ({placeholders})
+        """, tuple(decision_id for decision_id, _ in hits))
+        rows_by_id = {row['decision_id']: row for row in rows}
+        
+        results = []
+        for decision_id, score in hits:
+            row = rows_by_id.get(decision_id)
+            # Rows deleted since they were embedded are skipped
+            if row is None or (section_id is not None and row['section_id'] != section_id):
+                continue
+            row['similarity'] = round(score, 4)
+            results.append(row)
+        results = results[:limit]
+        
+        print(f"📊 Found {len(results)} similar decisions")
+        for i, decision in enumerate(results[:3], 1):
+            print(f"   {i}. ({decision['similarity']:.2f}) {decision['controller_action'][:50]}...")
+        return results
+    
     def get_train_details(self, train_ids: List[int]) -> List[Dict[str, Any]]:
         """
         Get detailed information about specific trains
@@ -161,14 +559,7 @@ class RAGRetriever:
         if not train_ids:
             return []
         
-        placeholders = ",".join(["?" for _ in train_ids])
-        query = f"""
-            SELECT * FROM Train
-            WHERE train_id IN ({placeholders})
-            ORDER BY priority ASC, delay_minutes DESC
-        """
-        
-        return self.db.execute_query(query, tuple(train_ids))
+        return self.db.execute_query(_train_details_query(len(train_ids)), tuple(train_ids))
     
     def get_context_for_decision(self, section_id: int, issue_description: str) -> Dict[str, Any]:
         """
@@ -182,3 +573,40 @@ class RAGRetriever:
         }
         
         return context
+
+    def check_query_plans(self) -> List[Dict[str, Any]]:
+        """
+        Run EXPLAIN QUERY PLAN over every retriever query and flag full table scans
+        """
+        since = datetime.now() - timedelta(days=1)
+        queries = [
+            ('section', SECTION_QUERY, (1,)),
+            ('trains', TRAINS_QUERY, (1,)),
+            ('stations', STATIONS_QUERY, (1,)),
+            ('external_factors', EXTERNAL_FACTORS_QUERY, (1,)),
+            ('recent_incidents', RECENT_INCIDENTS_QUERY, (1, since)),
+            ('section_metrics', SECTION_METRICS_QUERY, (1, since.date().isoformat())),
+        ]
+        if self.fts_enabled:
+            queries += [
+                ('similar_decisions', _fts_similar_decisions_query(True, 5), ('"signal"', 1)),
+                ('keyword_search', _fts_keyword_search_query(True, True, 10), ('"signal" OR "delay"', 1, 'Resolved')),
+            ]
+        else:
+            queries += [
+                ('similar_decisions', _similar_decisions_query(True, 5), ('%signal%', 1)),
+                ('keyword_search', _keyword_search_query(2, 10), ('%signal%', '%delay%')),
+            ]
+        queries += [
+            ('train_details', _train_details_query(2), (1001, 1002)),
+        ]
+        
+        report = []
+        for name, query, params in queries:
+            plan = self.db.explain_query_plan(query, params)
+            report.append({
+                'query': name,
+                'plan': plan,
+                'full_scans': [step for step in plan if _is_full_scan(step)]
+            })
+        return report
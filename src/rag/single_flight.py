@@ -0,0 +1,57 @@
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into one execution.
+
+    The first caller for a key starts the work; callers arriving while it is
+    still pending share its Future (and so its result or exception). Once the
+    call finishes the key is released, so later calls run afresh.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, Future] = {}
+        # Re-entrant: a Future started under the lock may complete (and release) immediately
+        self._lock = threading.RLock()
+        self.executed = 0
+        self.coalesced = 0
+        self.failed = 0
+
+    def submit(self, key: Hashable, start: Callable[[], Future]) -> Tuple[Future, bool]:
+        """
+        ``start`` launches the work and returns its Future. Returns (future,
+        shared); callers with the same key get the same Future until it
+        completes.
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, True
+            self.executed += 1
+            future = start()
+            self._inflight[key] = future
+        future.add_done_callback(lambda done: self._release(key, done))
+        return future, False
+
+    def _release(self, key: Hashable, future: Future):
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+            if future.cancelled() or future.exception() is not None:
+                self.failed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            requests = self.executed + self.coalesced
+            return {
+                'requests': requests,
+                'executed': self.executed,
+                'coalesced': self.coalesced,
+                'failed': self.failed,
+                'in_flight': len(self._inflight),
+                'saved_ratio': round(self.coalesced / requests, 3) if requests else 0.0
+            }
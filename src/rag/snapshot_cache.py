@@ -0,0 +1,73 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class SnapshotCache:
+    """
+    Bounded LRU cache of section snapshots.
+
+    Each entry remembers the table versions it was built from (see
+    DatabaseManager.table_versions); a lookup with different versions is a
+    miss, so entries go stale as soon as one of their tables is written.
+    ``max_age_seconds`` additionally bounds how long an entry is served, which
+    covers time-based parts of a snapshot such as the last-24h incidents.
+    Snapshots are deep-copied in and out, so callers may modify what they get.
+    """
+
+    def __init__(self, max_entries: int = 256, max_age_seconds: float = 60.0):
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[tuple, float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, versions: tuple) -> Optional[Dict[str, Any]]:
+        """Return a deep copy of the cached snapshot if it was built from ``versions``"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            entry_versions, created_at, snapshot = entry
+            if entry_versions != versions or time.monotonic() - created_at > self.max_age_seconds:
+                del self._entries[key]
+                self.stale += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        # Copied outside the lock; the stored snapshot itself is never modified
+        return copy.deepcopy(snapshot)
+
+    def put(self, key: Hashable, versions: tuple, snapshot: Dict[str, Any]):
+        """Store a snapshot built from ``versions``, evicting the least recently used entry if full"""
+        snapshot = copy.deepcopy(snapshot)
+        with self._lock:
+            self._entries[key] = (versions, time.monotonic(), snapshot)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'stale': self.stale,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0
+            }
@@ -0,0 +1,233 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from src.database.db_manager import SCHEMA_VERSION
+
+# Tables the application cannot run without
+REQUIRED_TABLES = ['Section', 'Train', 'Station', 'ExternalFactors', 'Incidents', 'Decisions',
+                   'SectionDailyStats', 'KeywordVocabulary', 'DecisionCache']
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def validate_schema(db) -> List[str]:
+    """
+    Check that the database is at SCHEMA_VERSION and has every required
+    table; returns the problems found (empty when the schema is fine)
+    """
+    problems = []
+    version = db.execute_query("PRAGMA user_version")[0]['user_version']
+    if version != SCHEMA_VERSION:
+        problems.append(f"schema version {version}, expected {SCHEMA_VERSION}")
+    for table in REQUIRED_TABLES:
+        if not db.table_exists(table):
+            problems.append(f"missing table {table}")
+    return problems
+
+
+def check_data(db) -> List[str]:
+    """
+    Data problems that degrade answers without stopping the application;
+    returns them as warnings (empty when there are none)
+    """
+    warnings = []
+    unplaced = db.execute_query(
+        "SELECT COUNT(*) AS trains FROM Train WHERE current_section_id IS NULL"
+    )[0]['trains']
+    if unplaced:
+        warnings.append(f"{unplaced} train(s) have no current section and are missing from every section snapshot")
+    return warnings
+
+
+def seed_if_empty(db) -> bool:
+    """Load the sample data, but only into a database without any sections; returns whether it did"""
+    if db.execute_query("SELECT COUNT(*) AS sections FROM Section")[0]['sections']:
+        return False
+    from src.database.populate_data import DataPopulator
+    print("🌱 Database is empty, seeding sample data...")
+    DataPopulator(db).populate_all_data()
+    return True
+
+
+class Warmup:
+    """
+    Pre-load caches in a background thread before traffic arrives and track
+    readiness.
+
+    Required steps (section snapshots, the full-text index, the embedding
+    index) must finish before the application reports ready; a failed step
+    is recorded and does not block readiness, since every cache also fills
+    lazily. Optional steps (loading the LLM client) run afterwards.
+    """
+
+    def __init__(self, engine, warm_llm: bool = True):
+        self.engine = engine
+        self.warm_llm = warm_llm
+        self.state = "pending"
+        self.started_at: Optional[float] = None
+        self.ready_at: Optional[float] = None
+        self.steps: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def _plan(self) -> List[tuple]:
+        """(name, function, required) in the order they run"""
+        steps = [
+            ('snapshots', self._warm_snapshots, True),
+            ('fts', self._warm_fts, True),
+            ('embeddings', self._warm_embeddings, True),
+            ('rules', lambda: self.engine.rule_engine, True),
+        ]
+        if self.warm_llm:
+            steps.append(('llm', self._warm_llm, False))
+        return steps
+
+    def start(self) -> threading.Thread:
+        with self._lock:
+            if self._thread is None:
+                self.state = "warming"
+                self.started_at = time.time()
+                self._thread = threading.Thread(target=self.run, name="startup-warmup", daemon=True)
+                self._thread.start()
+        return self._thread
+
+    def run(self):
+        """Run every step in order (start() runs this in the background)"""
+        plan = self._plan()
+        with self._lock:
+            for name, _, _ in plan:
+                self.steps[name] = {'status': 'pending'}
+        print("🔥 Warming caches...")
+        for name, step, required in plan:
+            if not required:
+                self._mark_ready()
+            self._run_step(name, step)
+        self._mark_ready()
+
+    def _run_step(self, name: str, step: Callable[[], Any]):
+        start = time.perf_counter()
+        try:
+            detail = step()
+            result = {'status': 'ok'}
+            if isinstance(detail, str):
+                result['detail'] = detail
+        except Exception as e:
+            print(f"Warning: warmup step {name} failed - {e}")
+            result = {'status': 'failed', 'error': str(e)}
+        result['ms'] = round((time.perf_counter() - start) * 1000, 1)
+        with self._lock:
+            self.steps[name] = result
+
+    def _mark_ready(self):
+        with self._lock:
+            if self.state != "ready":
+                self.state = "ready"
+                self.ready_at = time.time()
+                print(f"✅ Warmup complete in {self.ready_at - self.started_at:.2f}s"
+                      if self.started_at else "✅ Warmup complete")
+
+    def _warm_snapshots(self) -> str:
+        snapshots = self.engine.retriever.get_section_snapshots()
+        return f"{len(snapshots)} sections"
+
+    def _warm_fts(self) -> str:
+        retriever = self.engine.retriever
+        if not retriever.fts_enabled:
+            return "full-text index not available"
+        # Touch the index pages the keyword search reads
+        retriever.search_decisions_by_keywords(['signal', 'delay', 'power', 'weather'], limit=5)
+        return "index loaded"
+
+    def _warm_embeddings(self) -> str:
+        index = self.engine.retriever.get_vector_index()
+        return f"{len(index)} decisions" if index is not None else "vector search not available"
+
+    def _warm_llm(self) -> str:
+        # Imports the LLM stack and builds the client; no request is sent
+        return "ready" if self.engine.llm_available else "not available"
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'state': self.state,
+                'started_at': self.started_at,
+                'ready_at': self.ready_at,
+                'steps': {name: dict(step) for name, step in self.steps.items()}
+            }
+
+
+class Startup:
+    """
+    Production startup path: validate the schema, seed sample data into an
+    empty database if allowed (SEED_SAMPLE_DATA, on by default), report data
+    problems such as trains placed in no section, and warm the
+    caches in the background (WARMUP, on by default; WARMUP_LLM also loads the
+    LLM client). Never rewrites existing data.
+    """
+
+    def __init__(self, engine, seed: Optional[bool] = None, warmup: Optional[bool] = None,
+                 warm_llm: Optional[bool] = None):
+        self.engine = engine
+        self.seed = _env_flag("SEED_SAMPLE_DATA", True) if seed is None else seed
+        self.warmup_enabled = _env_flag("WARMUP", True) if warmup is None else warmup
+        self.warmup = Warmup(engine, _env_flag("WARMUP_LLM", True) if warm_llm is None else warm_llm)
+        self.schema_problems: List[str] = []
+        self.data_warnings: List[str] = []
+        self.seeded = False
+
+    def run(self) -> "Startup":
+        db = self.engine.db
+        self.schema_problems = validate_schema(db)
+        if self.schema_problems:
+            print(f"❌ Database schema check failed: {'; '.join(self.schema_problems)}")
+            return self
+        print(f"✅ Database schema v{SCHEMA_VERSION} validated")
+
+        if self.seed:
+            try:
+                self.seeded = seed_if_empty(db)
+            except Exception as e:
+                print(f"Warning: could not seed sample data - {e}")
+        self.data_warnings = check_data(db)
+        for warning in self.data_warnings:
+            print(f"Warning: {warning}")
+        if self.warmup_enabled:
+            self.warmup.start()
+        return self
+
+    @property
+    def ready(self) -> bool:
+        if self.schema_problems:
+            return False
+        return self.warmup.ready or not self.warmup_enabled
+
+    def health(self) -> Dict[str, Any]:
+        """Readiness report for the health endpoint"""
+        if self.schema_problems:
+            status = "failed"
+        elif self.ready:
+            status = "ready"
+        else:
+            status = "starting"
+        return {
+            'status': status,
+            'ready': status == "ready",
+            'schema': {'version': SCHEMA_VERSION, 'problems': list(self.schema_problems)},
+            'seeded': self.seeded,
+            'data_warnings': list(self.data_warnings),
+            'warmup': self.warmup.status() if self.warmup_enabled else {'state': 'disabled'}
+        }